@@ -1,6 +1,31 @@
-from numpy.core.fromnumeric import transpose
+import numpy as np
 from scipy import integrate
-from scipy.special.orthogonal import legendre
+
+# 把 [-1, 1] 上的 x 映射到 [a, b]
+def from_standard(x, a: float, b: float):
+    return ((b - a) / 2) * x + ((b + a) / 2)
+
+# 把 [a, b] 上的 x 映射到 [-1, 1]
+def to_standard(x, a: float, b: float):
+    return (2 * x - a - b) / (b - a)
+
+# Clenshaw 算法计算勒让德级数 sum c_k P_k(t)，利用 P_(k+1) = ((2k + 1) t P_k - k P_(k-1)) / (k + 1)
+def clenshaw_legendre(c, t):
+    t = np.asarray(t, dtype=float)
+    b1 = np.zeros_like(t)
+    b2 = np.zeros_like(t)
+    for k in range(len(c) - 1, -1, -1):
+        b1, b2 = c[k] + ((2 * k + 1) / (k + 1)) * t * b1 - ((k + 1) / (k + 2)) * b2, b1
+    return b1
+
+# Clenshaw 算法计算切比雪夫级数 sum c_k T_k(t)，利用 T_(k+1) = 2t T_k - T_(k-1)
+def clenshaw_chebyshev(c, t):
+    t = np.asarray(t, dtype=float)
+    b1 = np.zeros_like(t)
+    b2 = np.zeros_like(t)
+    for k in range(len(c) - 1, 0, -1):
+        b1, b2 = c[k] + 2 * t * b1 - b2, b1
+    return c[0] + t * b1 - b2
 
 class TargetFn:
     def __init__(self, a, b, c):
@@ -9,18 +34,14 @@ class TargetFn:
         self.c = c
         
     def fn(self, x: int, transform: bool):
-        a = self.a 
-        b = self.b 
-        t = ((b - a) / 2) * x + ((b + a) / 2)
+        t = from_standard(x, self.a, self.b)
         if transform:
             return (1 / ((self.c * t * t) + 1))
         else:
             return (1 / ((self.c * x * x) + 1))
 
     def legrand_fn(self, x: int):
-        a = self.a 
-        b = self.b 
-        t = ((b - a) / 2) * x + ((b + a) / 2)
+        t = from_standard(x, self.a, self.b)
         return (1 / ((self.c * t * t) + 1))
     
     def normal_fn(self, x: int):
@@ -30,8 +51,7 @@ class TargetFn:
 #     return (1 / ((c * x * x) + 1))
 
 def product_fn(x, pow0, a, b, c):
-    target = TargetFn(a, b, c)
-    res = target.fn(x) * pow(x, pow0)
+    res = (1 / ((c * x * x) + 1)) * pow(x, pow0)
     return res
 
 def product_fn_2(x, pow_1, pow_2):
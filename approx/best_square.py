@@ -1,43 +1,61 @@
 import numpy as np
-from scipy.special import legendre
-from scipy import integrate
-from . import TargetFn, inner_product, inner_product_2, inner_product_3, inner_product_4, mul_fn
+from functools import lru_cache
+from sys import path
+path.append('..')
+from integration.gauss import gauss_integrate, gauss_legendre
+from .legendre import Legendre
+from . import TargetFn, clenshaw_legendre
+
+# 单项式的 Gram 矩阵，(x^i, x^j) = (b^(i+j+1) - a^(i+j+1)) / (i+j+1)
+def gram_matrix(k: int, a: float, b: float):
+    p = np.add.outer(np.arange(k + 1), np.arange(k + 1)) + 1
+    return (np.power(float(b), p) - np.power(float(a), p)) / p
+
+# 按 (a, b, c, n) 缓存 Gauss-Legendre 节点以及权重与目标函数值之积，返回只读数组
+@lru_cache(maxsize=256)
+def _weighted_target(a: float, b: float, c: int, n: int):
+    x, w = gauss_legendre(n, a, b)
+    fw = w * TargetFn(a, b, c).normal_fn(x)
+    fw.flags.writeable = False
+    return (x, fw)
+
+# 目标函数与 x^0, ..., x^k 的内积
+# 所有次数共用同一组 Gauss-Legendre 节点上的一次函数求值，目标函数只在第一次用到 (a, b, c, n) 时计算
+def moments(k: int, a: float, b: float, c: int, n: int = 64):
+    x, fw = _weighted_target(a, b, c, n)
+    return np.power.outer(x, np.arange(k + 1)).T @ fw
+
+# 按 (k, a, b, c) 缓存最佳平方逼近的系数(低次项在前)
+@lru_cache(maxsize=256)
+def _fit_coefficients(k: int, a: float, b: float, c: int):
+    res = np.linalg.solve(gram_matrix(k, a, b), moments(k, a, b, c))
+    return tuple(res)
 
 class BestSquare:
     def __init__(self, k: int, a: float, b: float, c: int):
         self.k = k
-        self.left = []
-        self.right = []
         self.a = a
         self.b = b
         self.c = c
         self.f = np.poly1d([0])
 
-    def _make_matrix(self):
-        # 建立矩阵
-        for i in range(0, self.k + 1):
-            row = []
-            for j in range(0, self.k + 1):
-                (res, _) = inner_product_3(i, j, self.a, self.b)
-                row.append(res)
-            (res, _) = inner_product_2(i, self.a, self.b, self.c)
-            self.right.append(res)
-            self.left.append(row)
-
-    def legrand_fit(self):
+    def legrand_fit(self, n: int = 64):
         # 使用勒让德多项式作为正交多项式进行拟合
-        self.coefficients = []
-        for i in range(0, self.k + 1):
-            (res, _) = integrate.quad(mul_fn, -1, 1, args=(legendre(i), self.a, self.b, self.c))
-            res *= ((2 * i + 1) / 2)
-            self.coefficients.append(res)
-        for i in range(0, self.k + 1):
-            self.f += (self.coefficients[i] * legendre(i))
+        # 所有 k + 1 个投影 (f, P_i) 共用同一组 Gauss-Legendre 节点，目标函数只在节点上计算一次
+        target = TargetFn(self.a, self.b, self.c)
+        def integrand(x):
+            return Legendre(self.k).table(x) * target.fn(x, True)
+        res = gauss_integrate(integrand, max(n, self.k + 1))
+        self.coefficients = (((2 * np.arange(self.k + 1) + 1) / 2) * res).tolist()
+        # 直接在勒让德基下用 Clenshaw 递推求值，不再展开成单项式
+        self.f = self._legendre_cal
+
+    def _legendre_cal(self, x):
+        return clenshaw_legendre(self.coefficients, x)
 
     def fit(self):
-        # 函数拟合，实际上就是根据次数解矩阵，最后把系数求出来
-        self._make_matrix()
-        res = list(reversed(np.linalg.solve(self.left, self.right)))
+        # 函数拟合，实际上就是根据次数解矩阵，最后把系数求出来；系数按 (k, a, b, c) 缓存，无需再建立矩阵
+        res = list(reversed(_fit_coefficients(self.k, self.a, self.b, self.c)))
         f = np.poly1d(res)
         self.f = f
 
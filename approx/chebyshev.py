@@ -0,0 +1,75 @@
+import numpy as np
+from numpy.polynomial import chebyshev
+from scipy.fft import dct
+from . import from_standard, to_standard, clenshaw_chebyshev
+
+# 切比雪夫代理逼近：在 [a, b] 上用切比雪夫级数 sum c_k T_k(t) 近似任意可向量化的函数 fn，
+# 之后用代价很低的 cal 代替对 fn 的调用
+class Chebyshev:
+    def __init__(self, fn, a: float, b: float):
+        self.fn = fn
+        self.a = a
+        self.b = b
+        self.coef = None
+        # 对 fn 的求值次数
+        self.evals = 0
+
+    @staticmethod
+    def from_coef(coef, a: float, b: float):
+        proxy = Chebyshev(None, a, b)
+        proxy.coef = np.asarray(coef, dtype=float)
+        return proxy
+
+    # n + 1 个切比雪夫-洛巴托点 cos(pi j / n) 上的函数值经 DCT-I 变换即得到系数，复杂度 O(n log n)
+    @staticmethod
+    def _coefficients(values):
+        n = len(values) - 1
+        c = dct(values, type=1) / n
+        c[0] /= 2
+        c[-1] /= 2
+        return c
+
+    def _sample(self, t):
+        self.evals += len(t)
+        # fn 返回标量(如常数函数)时扩展到与采样点相同的形状
+        return np.broadcast_to(np.asarray(self.fn(from_standard(t, self.a, self.b)), dtype=float), t.shape)
+
+    # 自适应确定次数：点数每次加倍，新网格只需在原网格的中点处补充采样，
+    # 直到最后几个系数相对最大系数小于 delta，再截掉尾部可以忽略的系数
+    def fit(self, delta: float = 1e-13, n: int = 16, max_n: int = 65536):
+        values = self._sample(np.cos(np.pi * np.arange(n + 1) / n))
+        while True:
+            c = self._coefficients(values)
+            scale = np.max(np.abs(c))
+            if np.max(np.abs(c[-3:])) <= delta * scale:
+                break
+            if 2 * n > max_n:
+                print("[Debug] 切比雪夫系数在 {} 次时仍未衰减到要求的精度".format(n))
+                break
+            mid = self._sample(np.cos(np.pi * (2 * np.arange(n) + 1) / (2 * n)))
+            new_values = np.empty(2 * n + 1)
+            new_values[0::2] = values
+            new_values[1::2] = mid
+            values = new_values
+            n *= 2
+        keep = np.nonzero(np.abs(c) > delta * scale)[0]
+        self.coef = c[:keep[-1] + 1] if len(keep) > 0 else c[:1]
+        return self
+
+    def cal(self, x):
+        return clenshaw_chebyshev(self.coef, to_standard(x, self.a, self.b))
+
+    # 导函数的代理，dt/dx = 2 / (b - a)
+    def derivative(self):
+        coef = chebyshev.chebder(self.coef) * (2 / (self.b - self.a))
+        return Chebyshev.from_coef(coef, self.a, self.b)
+
+    # 原函数的代理，满足 F(a) = 0
+    def antiderivative(self):
+        coef = chebyshev.chebint(self.coef, lbnd=-1) * ((self.b - self.a) / 2)
+        return Chebyshev.from_coef(coef, self.a, self.b)
+
+    # 在 [a, b] 上的定积分，int T_k(t) dt 在 k 为偶数时为 2 / (1 - k^2)，奇数时为 0
+    def integral(self):
+        k = np.arange(0, len(self.coef), 2)
+        return np.sum(self.coef[0::2] * 2 / (1 - k * k)) * ((self.b - self.a) / 2)
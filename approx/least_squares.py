@@ -1,37 +1,63 @@
-import re
 import numpy as np
-from typing import List
+from scipy.linalg import solve_triangular
 from sys import path
 path.append('..')
-from point import Point
+from point import SampleSet
+from . import to_standard, clenshaw_legendre, clenshaw_chebyshev
 
 class LeastSquare:
-    def __init__(self, a: float, b: float, c: int, k: int, samples: List[Point]):
-        self.a = a 
+    # basis 为拟合所用的基函数: 'monomial' 为 x^j，'legendre' 与 'chebyshev' 为映射到 [-1, 1] 后的正交多项式，
+    # 高次拟合时正交基的设计矩阵条件数远小于单项式基
+    def __init__(self, a: float, b: float, c: int, k: int, samples: SampleSet = None, basis: str = 'monomial'):
+        self.a = a
         self.b = b
         self.c = c
-        self.samples = samples
-        self.n = len(samples)
+        self.samples = None if samples is None else SampleSet.of(samples)
+        self.n = 0 if samples is None else len(samples)
         self.k = k
+        if basis not in ('monomial', 'legendre', 'chebyshev'):
+            raise ValueError("未知的基函数: {}".format(basis))
+        self.basis = basis
+        # 流式拟合时保存的增广矩阵 [V y] 的 R 因子
+        self.R = None
+
+    # 构造 (n, k + 1) 的设计矩阵，第 j 列为第 j 个基函数在采样点上的值
+    def _design(self, x):
+        if self.basis == 'legendre':
+            return np.polynomial.legendre.legvander(to_standard(x, self.a, self.b), self.k)
+        if self.basis == 'chebyshev':
+            return np.polynomial.chebyshev.chebvander(to_standard(x, self.a, self.b), self.k)
+        return np.vander(x, self.k + 1, increasing=True)
+
+    # 由上三角方程 R c = z 求出各基函数的系数
+    def _solve(self, R, z):
+        self.coef = solve_triangular(R, z)
+        if self.basis == 'monomial':
+            self.f = np.poly1d(self.coef[::-1])
 
     def fit(self):
-        A = []
-        B = []
-        for i in range(0, self.k + 1):
-            row = []
-            for j in range(0, self.k + 1):
-                res = 0
-                for item in self.samples:
-                    res += pow(item.x, i + j)
-                row.append(res)
-            y = 0
-            for item in self.samples:
-                y += pow(item.x, i) * item.y
-            A.append(row)
-            B.append(y)
-        res = list(reversed(np.linalg.solve(A, B)))
-        f = np.poly1d(res)
-        self.f = f
-    
+        # 对设计矩阵做 QR 分解求解最小二乘问题，避免构造病态的法方程组
+        V = self._design(self.samples.x)
+        Q, R = np.linalg.qr(V)
+        self._solve(R, Q.T @ self.samples.y)
+
+    # 流式拟合：分块加入采样点，每次把新数据与已有的 R 因子合并后重新做 QR 分解，
+    # 内存只与 k 和分块大小有关，与样本总数无关
+    def partial_fit(self, samples: SampleSet):
+        samples = SampleSet.of(samples)
+        block = np.column_stack([self._design(samples.x), samples.y])
+        if self.R is not None:
+            block = np.vstack([self.R, block])
+        self.R = np.linalg.qr(block, mode='r')
+        self.n += len(samples)
+        k = self.k + 1
+        if self.R.shape[0] >= k:
+            self._solve(self.R[:k, :k], self.R[:k, k])
+
+    # 正交基下直接用 Clenshaw 递推求值，每个点 O(k)
     def cal(self, x):
-        return self.f(x)
\ No newline at end of file
+        if self.basis == 'legendre':
+            return clenshaw_legendre(self.coef, to_standard(x, self.a, self.b))
+        if self.basis == 'chebyshev':
+            return clenshaw_chebyshev(self.coef, to_standard(x, self.a, self.b))
+        return self.f(x)
@@ -1,12 +1,66 @@
+import numpy as np
+
 class Legendre:
     def __init__(self, n: int):
-        self.n = n 
+        self.n = n
+
+    # 用三项递推 P_(k+1) = ((2k + 1) x P_k - k P_(k-1)) / (k + 1) 一次求出 P_0, ..., P_n，
+    # 返回形状为 (n + 1, m) 的表，第 k 行为 P_k 在各点上的值
+    def table(self, x):
+        x = np.asarray(x, dtype=float)
+        P = np.empty((self.n + 1,) + x.shape)
+        P[0] = 1
+        if self.n >= 1:
+            P[1] = x
+        for k in range(1, self.n):
+            P[k + 1] = ((2 * k + 1) * x * P[k] - k * P[k - 1]) / (k + 1)
+        return P
+
+    # 导数表，利用 P_(k+1)' = P_(k-1)' + (2k + 1) P_k
+    def derivative_table(self, x):
+        P = self.table(x)
+        D = np.zeros_like(P)
+        if self.n >= 1:
+            D[1] = 1
+        for k in range(1, self.n):
+            D[k + 1] = D[k - 1] + (2 * k + 1) * P[k]
+        return D
+
+    # 只保留最近两项递推，同时得到 P_n 与 P_n'
+    def _value_and_derivative(self, x):
+        p0 = np.ones_like(x)
+        p1 = x.copy()
+        d0 = np.zeros_like(x)
+        d1 = np.ones_like(x)
+        if self.n == 0:
+            return (p0, d0)
+        for k in range(1, self.n):
+            p0, p1 = p1, ((2 * k + 1) * x * p1 - k * p0) / (k + 1)
+            d0, d1 = d1, d0 + (2 * k + 1) * p0
+        return (p1, d1)
 
     def fn(self, x):
-        # 递归定义的勒让德多项式
+        x = np.asarray(x, dtype=float)
+        return self._value_and_derivative(x)[0]
+
+    def derivative(self, x):
+        x = np.asarray(x, dtype=float)
+        return self._value_and_derivative(x)[1]
+
+    # P_n 的零点与对应的 Gauss-Legendre 权重 w_i = 2 / ((1 - x_i^2) P_n'(x_i)^2)
+    # 以 cos(pi (i - 1/4) / (n + 1/2)) 为初值，对所有零点同时做牛顿迭代
+    def roots(self, delta: float = 1e-15, max_iter: int = 100):
+        # P_0 没有零点
         if self.n == 0:
-            return 1
-        elif self.n == 1:
-            return x
-        else:
-            return (((2 * self.n) - 1) * x * self.fn(self.n - 1, x) - (self.n - 1) * self.fn(self.n - 2, x)) / float(self.n)
+            return (np.zeros(0), np.zeros(0))
+        i = np.arange(1, self.n + 1)
+        x = np.cos(np.pi * (i - 0.25) / (self.n + 0.5))
+        for _ in range(max_iter):
+            p, dp = self._value_and_derivative(x)
+            dx = p / dp
+            x -= dx
+            if np.max(np.abs(dx)) < delta:
+                break
+        _, dp = self._value_and_derivative(x)
+        w = 2 / ((1 - x * x) * dp * dp)
+        return (x[::-1], w[::-1])
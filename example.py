@@ -2,10 +2,13 @@ import math
 from random import gauss
 from approx import TargetFn
 from approx.best_square import BestSquare
+from approx.chebyshev import Chebyshev
 from approx.least_squares import LeastSquare
-from integration import romberg, stdintegrate, trapezodial
+from integration import romberg, stdfn, stdintegrate, trapezodial
+from integration.adaptive import gauss_kronrod
 from matrix import Matrix
 from nonlinear import NonLinear
+from nonlinear.batch import batch_fixed_iter, batch_newton_iter, batch_stefenson_iter
 import point
 import interp
 from draw import Drawer
@@ -16,6 +19,8 @@ from interp.piece_linear import PieceLinear
 from interp.vandermonde import Vandermonde
 
 import numpy as np
+import sympy
+from scipy import sparse
 
 def test_vandermonde():
     print("范德蒙德插值法")
@@ -82,10 +87,7 @@ def test_piecelinear():
     piece_linear = PieceLinear(samples)
     piece_linear.interp()
     other_samples = point.random_sample(5, a, b, c, d, e, f)
-    for i in range(len(other_samples)):
-        y = piece_linear.cal(other_samples[i].x)
-        err = abs(y - other_samples[i].y)
-        print("插值法计算的结果为：{}, 原函数计算的结果为: {}, 误差为: {}".format(y, other_samples[i].y, err))
+    interp.point_test(piece_linear.vector_cal, other_samples)
     drawer = Drawer()
     drawer.draw_interp(a, b, c, d, e, f, piece_linear.vector_cal, 'Piecewise Linear Method')
 
@@ -100,17 +102,11 @@ def test_hermite():
     e = 1
     f = 1
     samples = point.fixed_sample(npoints, a, b, c, d, e, f)
-    for i in range(0, len(samples)):
-        d = point.point_derivative(samples[i].x, c, d, e, f)
-        samples[i].derivative(d)
-        # print("导数为: {}".format(d))
+    samples.derivative(point.point_derivative(samples.x, c, d, e, f))
     hermite = Hermite(samples)
     hermite.interp()
     other_samples = point.random_sample(5, a, b, c, d, e, f)
-    for i in range(len(other_samples)):
-        y = hermite.cal(other_samples[i].x)
-        err = abs(y - other_samples[i].y)
-        print("插值法计算的结果为：{}, 原函数计算的结果为: {}, 误差为: {}".format(y, other_samples[i].y, err))
+    interp.point_test(hermite.vector_cal, other_samples)
     drawer = Drawer()
     drawer.draw_interp(a, b, c, d, e, f, hermite.vector_cal, 'Cubic Hermite Method')
 
@@ -147,6 +143,18 @@ def test_least_square(a: float, b: float, c: int, n: int, k: int):
     drawer.cmp_draw(a, b, target_fn.normal_fn, least_square.cal, 'Least Square Method(k = 3)')
 
 
+def test_chebyshev(a: float, b: float, c: int, n: int):
+    target_fn = TargetFn(a, b, c)
+    proxy = Chebyshev(target_fn.normal_fn, a, b).fit()
+    print("切比雪夫代理的次数为: {}, 原函数求值次数为: {}".format(len(proxy.coef) - 1, proxy.evals))
+    samples = point.random_x(a, b, n)
+    for sample in samples:
+        std_val = target_fn.normal_fn(sample)
+        app_val = proxy.cal(sample)
+        err = abs(std_val - app_val)
+        print("标准函数计算的结果为：{}, 逼近函数计算的结果为: {}, 误差为: {}".format(std_val, app_val, err))
+    print("定积分为: {}, 导数在 x = {} 处为: {}".format(proxy.integral(), a, proxy.derivative().cal(a)))
+
 # 复化梯形公式
 def test_trapezodial(a: float, b: float, delta: float):
     i = 1
@@ -163,7 +171,18 @@ def test_trapezodial(a: float, b: float, delta: float):
 
 # 龙贝格积分测试
 def test_romberg(a: float, b: float, delta: float):
-    romberg(a, b, delta)
+    integrate, k, evals = romberg(a, b, delta)
+    std_integrate = stdintegrate(a, b)
+    err = abs(integrate - std_integrate)
+    print("标准函数积分值为: {}, 数值积分值为: {}, 误差为: {}".format(std_integrate, integrate, err))
+    print("此时 k = {}, h = {}, 函数求值次数为: {}".format(k, (b - a) / pow(2, k), evals))
+
+# 自适应 Gauss-Kronrod 积分测试
+def test_gauss_kronrod(a: float, b: float, delta: float):
+    integrate, err, evals = gauss_kronrod(stdfn, a, b, delta)
+    std_integrate = stdintegrate(a, b)
+    print("标准函数积分值为: {}, 数值积分值为: {}, 误差为: {}".format(std_integrate, integrate, abs(integrate - std_integrate)))
+    print("误差估计为: {}, 函数求值次数为: {}".format(err, evals))
 
 def test_gaussian_elimination():
     A = np.array([
@@ -209,20 +228,20 @@ def test_LU():
 
     matrix = Matrix(A, B)
     ans = matrix.slove()
-    (L, U, x) = matrix.LU_decomposition_slove()
+    (P, L, U, x) = matrix.LU_decomposition_slove()
     print("---------------------使用 LU 分解法求解给定的矩阵 --------------------")
     print("正确结果为: {}".format(ans))
     print("使用 LU 分解法计算出的结果为: {}".format(x))
-    # print("L 为: {}, \nU 为: {}".format(L, U))
+    # print("P 为: {}, \nL 为: {}, \nU 为: {}".format(P, L, U))
 
     (random_matrix, random_vector) = Matrix.random_non_singular_matrix(20)
     matrix = Matrix(random_matrix, random_vector)
     ans = matrix.slove()
-    (L, U, x) = matrix.LU_decomposition_slove()
+    (P, L, U, x) = matrix.LU_decomposition_slove()
     print("---------------------使用 LU 分解法求解随机生成的矩阵 --------------------")
     print("正确结果为: {}".format(ans))
     print("使用 LU 分解法计算出的结果为: {}".format(x))
-    # print("L 为: {}, \nU 为: {}".format(L, U))
+    # print("P 为: {}, \nL 为: {}, \nU 为: {}".format(P, L, U))
 
 def test_gauss_seidel():
     A = np.array([
@@ -245,6 +264,42 @@ def test_gauss_seidel():
     print("正确结果为: {}".format(ans))
     print("使用高斯-塞德尔计算出的结果为: {}, 迭代次数为 {}".format(x, count))
 
+# 二维泊松方程五点差分格式对应的 k^2 阶稀疏矩阵与全 1 的右端项
+def poisson_matrix(k: int = 50):
+    T = sparse.diags([-1.0, 4.0, -1.0], [-1, 0, 1], shape=(k, k))
+    S = sparse.diags([-1.0, -1.0], [-1, 1], shape=(k, k))
+    A = sparse.kron(sparse.identity(k), T) + sparse.kron(S, sparse.identity(k))
+    return Matrix(A, np.ones(k * k))
+
+def test_sparse_gauss_seidel():
+    matrix = poisson_matrix()
+    B = matrix.vector
+    ans = matrix.slove()
+    x0 = np.zeros_like(B)
+    x, count = matrix.gauss_seidel(x0, 1e-8)
+    print("---------------------使用稀疏高斯-塞德尔方法求解五点差分方程组 --------------------")
+    print("最大误差为: {}, 迭代次数为 {}".format(max(abs(x - ans)), count))
+
+def test_multicolor_gauss_seidel():
+    matrix = poisson_matrix()
+    B = matrix.vector
+    ans = matrix.slove()
+    x0 = np.zeros_like(B)
+    x, count = matrix.multicolor_gauss_seidel(x0, 1e-8, workers=4)
+    print("---------------------使用红黑排序的高斯-塞德尔方法求解五点差分方程组 --------------------")
+    print("颜色数为: {}, 最大误差为: {}, 迭代次数为 {}".format(len(matrix.coloring()), max(abs(x - ans)), count))
+
+def test_krylov():
+    matrix = poisson_matrix()
+    B = matrix.vector
+    ans = matrix.slove()
+    print("---------------------使用 Krylov 子空间方法求解五点差分方程组 --------------------")
+    for method in [matrix.cg, matrix.gmres, matrix.bicgstab]:
+        for precond in [None, 'jacobi', 'ssor', 'ilu']:
+            x0 = np.zeros_like(B)
+            x, count, _ = method(x0, 1e-10, precond)
+            print("{} 预条件: {}, 最大误差为: {}, 迭代次数为 {}".format(method.__name__, precond, max(abs(x - ans)), count))
+
 def test_sor():
     A = np.array([
         [31.0, -13, 0, 0, 0, -10, 0, 0, 0 ],
@@ -275,6 +330,27 @@ def test_sor():
         print("使用 SOR 算法计算出的结果为: {}, 迭代次数为 {}".format(x, count))
     print("最少迭代次数为: {}, 此时 omega 为: {}".format(count_min, beset_omega))
 
+def test_adaptive_sor():
+    A = np.array([
+        [31.0, -13, 0, 0, 0, -10, 0, 0, 0 ],
+        [-13, 35, -9, 0, -11, 0, 0, 0, 0],
+        [0, -9, 31, -10, 0, 0, 0, 0, 0  ], 
+        [0, 0, -10, 79, -30, 0, 0, 0, -9],
+        [0, 0, 0, -30, 57, -7, 0, -5, 0 ],
+        [0, 0, 0, 0, -7, 47, -30, 0, 0  ],
+        [0, 0, 0, 0, 0, -30, 41, 0, 0   ],
+        [0, 0, 0, 0, -5, 0, 0, 27, -2   ],
+        [0, 0, 0, -9, 0, 0, 0, -2, 29   ]
+    ])
+    B = np.array([-15.0, 27, -23, 0, -20, 12, -7, 7, 10])
+    matrix = Matrix(A, B)
+    ans = matrix.slove()
+    x0 = np.zeros_like(B)
+    x, count, omega = matrix.adaptive_sor(x0, 1e-8)
+    print("---------------------使用自动选取松弛因子的 SOR 方法求解给定的矩阵 --------------------")
+    print("正确结果为: {}".format(ans))
+    print("使用 SOR 算法计算出的结果为: {}, 迭代次数为 {}, 此时 omega 为: {}".format(x, count, omega))
+
 def test_nonlinear():
     def f(x):
         return (x*x + 2 - math.exp(x))/3
@@ -300,6 +376,9 @@ def test_nonlinear():
     x, count = non_linear.newton_iter(x0, delta)
     print("------------------牛顿迭代法----------------------")
     print("求得的根为: {}, 迭代次数为: {}".format(x, count))
+    x, count = non_linear.brent(0, 1, delta)
+    print("------------------Brent 方法----------------------")
+    print("求得的根为: {}, 迭代次数为: {}".format(x, count))
 
     non_linear = NonLinear([g])
     x0 = 1.36
@@ -314,6 +393,9 @@ def test_nonlinear():
     x, count = non_linear.newton_iter(x0, delta)
     print("------------------牛顿迭代法----------------------")
     print("求得的根为: {}, 迭代次数为: {}".format(x, count))
+    x, count = non_linear.brent(1, 2, delta)
+    print("------------------Brent 方法----------------------")
+    print("求得的根为: {}, 迭代次数为: {}".format(x, count))
 
 def test_vec_nonlinear():
     print("---------------------非线性方程组-------------------")
@@ -343,6 +425,100 @@ def test_vec_nonlinear():
     print("求得的根为: {}, 迭代次数为: {}".format(x, count))
 
 
+def test_jacobian():
+    print("---------------------雅可比矩阵-------------------")
+    # 使用 sympy 函数书写的方程组可以直接符号求导
+    def f(x):
+        return 3*x[0] - sympy.cos(x[1] * x[2]) - 0.5
+    def g(x):
+        return x[0]**2 - 81 * (x[1] + 1)**2 + sympy.sin(x[2]) + 1.06
+    def h(x):
+        return sympy.exp(-x[0] * x[1]) + 20 * x[2] + (10/3)*sympy.pi - 1
+    x0 = np.array([0.1, 0.1, -0.1])
+    delta = 1e-8
+    non_linear = NonLinear([f, g, h])
+    (x, count) = non_linear.vec_newton_iter(x0, delta)
+    print("符号求导: 求得的根为: {}, 迭代次数为: {}".format(x, count))
+
+    # 手工给出的雅可比矩阵
+    def jacobian(x):
+        return np.array([
+            [3, x[2] * math.sin(x[1] * x[2]), x[1] * math.sin(x[1] * x[2])],
+            [2 * x[0], -162 * (x[1] + 1), math.cos(x[2])],
+            [-x[1] * math.exp(-x[0] * x[1]), -x[0] * math.exp(-x[0] * x[1]), 20]
+        ])
+    def f2(x):
+        return 3*x[0] - math.cos(x[1] * x[2]) - 0.5
+    def g2(x):
+        return pow(x[0], 2) - 81 * pow((x[1] + 1), 2) + math.sin(x[2]) + 1.06
+    def h2(x):
+        return math.exp(-x[0] * x[1]) + 20 * x[2] + (10/3)*math.pi - 1
+    non_linear = NonLinear([f2, g2, h2], jacobian)
+    (x, count) = non_linear.vec_newton_iter(x0, delta)
+    print("解析雅可比: 求得的根为: {}, 迭代次数为: {}".format(x, count))
+
+    # 使用 math 函数时无法符号求导，退化为前向差分
+    non_linear = NonLinear([f2, g2, h2])
+    (x, count) = non_linear.vec_newton_iter(x0, delta)
+    print("前向差分: 求得的根为: {}, 迭代次数为: {}".format(x, count))
+
+def test_broyden():
+    print("---------------------Broyden 拟牛顿法-------------------")
+    # Broyden 三对角问题 (3 - 2 x_i) x_i - x_(i-1) - 2 x_(i+1) + 1 = 0
+    n = 100
+    def equation(i):
+        def f(x):
+            left = x[i - 1] if i > 0 else 0
+            right = x[i + 1] if i < n - 1 else 0
+            return (3 - 2 * x[i]) * x[i] - left - 2 * right + 1
+        return f
+    non_linear = NonLinear([equation(i) for i in range(n)])
+    x0 = -np.ones(n)
+    delta = 1e-10
+    (x, count) = non_linear.vec_newton_iter(x0, delta)
+    print("牛顿迭代法: 迭代次数为: {}, 残差为: {}".format(count, max(abs(non_linear.Fn(x)))))
+    for mode in ('good', 'bad'):
+        (x, count) = non_linear.broyden_iter(x0, delta, mode)
+        print("Broyden ({}): 迭代次数为: {}, 残差为: {}".format(mode, count, max(abs(non_linear.Fn(x)))))
+    (x, count) = non_linear.broyden_iter(x0, delta, 'good', refresh=5)
+    print("Broyden (每 5 步刷新雅可比矩阵): 迭代次数为: {}, 残差为: {}".format(count, max(abs(non_linear.Fn(x)))))
+
+def test_batch_nonlinear():
+    print("---------------------批量求解开普勒方程 E - e sin(E) = M-------------------")
+    e = 0.3
+    M = np.linspace(0, 2 * np.pi, 100000)
+    delta = 1e-12
+    def f(x, p):
+        return x - e * np.sin(x) - p
+    def g(x, p):
+        return p + e * np.sin(x)
+    for name, (E, count) in [
+        ("不动点迭代法", batch_fixed_iter(g, M, delta, params=M)),
+        ("斯蒂芬森迭代法", batch_stefenson_iter(g, M, delta, params=M)),
+        ("牛顿迭代法(复步长求导)", batch_newton_iter(f, M, delta, params=M))]:
+        print("{}: 最大残差为: {}, 最大迭代次数为: {}, 平均迭代次数为: {}".format(
+            name, max(abs(f(E, M))), max(count), np.mean(count)))
+
+def test_global_newton():
+    print("---------------------线搜索与信赖域-------------------")
+    def f(x):
+        return 3*x[0] - math.cos(x[1] * x[2]) - 0.5
+    def g(x):
+        return pow(x[0], 2) - 81 * pow((x[1] + 1), 2) + math.sin(x[2]) + 1.06
+    def h(x):
+        return math.exp(-x[0] * x[1]) + 20 * x[2] + (10/3)*math.pi - 1
+    non_linear = NonLinear([f, g, h])
+    # 远离根的初始点，直接使用牛顿迭代法时 exp 会溢出，迭代提前终止
+    x0 = np.array([20.0, 20, 20])
+    delta = 1e-10
+    (x, count) = non_linear.vec_newton_iter(x0, delta)
+    print("牛顿迭代法: 求得的根为: {}, 迭代次数为: {}".format(x, count))
+    (x, count, evals) = non_linear.line_search_iter(x0, delta)
+    print("线搜索牛顿法: 求得的根为: {}, 迭代次数为: {}, 求值次数为: {}".format(x, count, evals))
+    for method in ('dogleg', 'lm'):
+        (x, count, evals) = non_linear.trust_region_iter(x0, delta, method)
+        print("信赖域方法 ({}): 求得的根为: {}, 迭代次数为: {}, 求值次数为: {}".format(method, x, count, evals))
+
 
 def example():
     # test_vandermonde()
@@ -352,14 +528,24 @@ def example():
     # test_hermite()
     # test_best_square(1, 5, 1, 3, 10)
     # test_least_square(1, 5, 1, 100, 3)
+    # test_chebyshev(1, 5, 1, 10)
     # test_trapezodial(1, 5, 0.0001)
     # test_romberg(1, 5, 0.0001)
+    # test_gauss_kronrod(0, 5, 1e-10)
     # test_gaussian_elimination()
     # test_LU()
     # test_gauss_seidel()
+    # test_sparse_gauss_seidel()
+    # test_multicolor_gauss_seidel()
+    # test_krylov()
     # test_sor()
+    # test_adaptive_sor()
     test_nonlinear()
     test_vec_nonlinear()
+    # test_jacobian()
+    # test_broyden()
+    # test_batch_nonlinear()
+    # test_global_newton()
 
 if __name__ == '__main__':
     example()
\ No newline at end of file
@@ -1,66 +1,45 @@
-import math
-from numpy.core.fromnumeric import std
+import numpy as np
 from scipy.integrate import quad
 
-# 标准函数
-def stdfn(x: float):
-    return math.sqrt(x) * math.log(x)
+# 标准函数，可以直接作用于数组
+def stdfn(x):
+    return np.sqrt(x) * np.log(x)
 
 def stdintegrate(a: float, b: float):
     res, _ = quad(stdfn, a, b)
     return res
 
-# class Trapezodial:
-#     def __init__(self, a: float, b: float, h: float):
-#         self.a = a
-#         self.b = b
-#         self.h = h
-#         self.samples = []
-
-def trapezodial(a: float, b: float, h: float):
-    res = stdfn(a) + stdfn(b)
-    x = a + h 
-    while x < b:
-        res += 2 * stdfn(x)
-        x += h 
-    res *= (h / 2)
+# 复化梯形公式，一次性在所有节点上计算函数值
+def trapezodial(a: float, b: float, h: float, fn=stdfn):
+    n = max(1, int(round((b - a) / h)))
+    y = fn(np.linspace(a, b, n + 1))
+    res = (np.sum(y) - (y[0] + y[-1]) / 2) * ((b - a) / n)
     return res
- 
-def romberg(a: float, b: float, delta: float):
-    table = [[0 for _ in range(0, 100)] for _ in range(0, 100)]
-    # for i in range(0, total):
-    #     y = trapezodial(a, b, ((b - a) / (i + 1)))
-    #     table[0][i] = y
-
-    # std_integrate = stdintegrate(a, b)
-    # for i in range(1, total):
-    #     for j in range(i, total):
-    #         y = (pow(4, i)/(pow(4, i) - 1)) * table[i-1][j-i+1] - (1/((pow(4, i) - 1))) * table[i-1][j-i]
-    #         table[i][j] = y
-    #         err = abs(std_integrate - y)
-    #         if err < delta:
-    #             print("标准函数积分值为: {}, 数值积分值为: {}, 误差为: {}".format(std_integrate, table[i][j], err))
-    #             print("此时 m = {}, k = {}".format(i, j - i))
-    #             return
-    std_integrate = stdintegrate(a, b)
-    table[0][0] = trapezodial(a, b, (b - a))
-    k = 1
-    err = abs(std_integrate - table[0][0])
-    while err >= delta:
-        for m in range(0, k + 1):
-            if m == 0:
-                table[k][m] = trapezodial(a, b, ((b - a) / pow(2, k)))
-            else:
-                table[k][m] = (pow(4, m)/(pow(4, m) - 1)) * table[k][m - 1] - (1/((pow(4, m) - 1))) * table[k-1][m - 1]
-            err = abs(std_integrate - table[k][m])
-            if err < delta:
-                h = (b - a) / pow(2, k)
-                print("标准函数积分值为: {}, 数值积分值为: {}, 误差为: {}".format(std_integrate, table[k][m], err))
-                print("此时 m = {}, k = {}, h = {}".format(m, k, h))
-                break
-        k += 1
-    
-    
 
-        
-    
+# 龙贝格积分
+# 每次把步长减半时只计算新增的中点，T(h/2) = T(h)/2 + (h/2) * sum f(中点)；
+# 外推表只保留相邻两行，以相邻两次对角线元素之差作为误差估计。
+# max_k 限制二分次数，最后一次需要一次性计算 2^(max_k - 1) 个中点。
+# 返回 (积分值, 二分次数 k, 函数求值次数)
+def romberg(a: float, b: float, delta: float, fn=stdfn, max_k: int = 20):
+    h = b - a
+    prev = [h * np.sum(fn(np.array([a, b]))) / 2]
+    evals = 2
+    for k in range(1, max_k + 1):
+        n = pow(2, k - 1)
+        x = a + h * (np.arange(n) + 0.5)
+        row = [prev[0] / 2 + (h / 2) * np.sum(fn(x))]
+        evals += n
+        h /= 2
+        for m in range(1, k + 1):
+            row.append(row[m - 1] + (row[m - 1] - prev[m - 1]) / (pow(4, m) - 1))
+        err = abs(row[k] - prev[k - 1])
+        # 被积函数在节点上出现 nan 或 inf 时继续二分也无法收敛
+        if not (np.isfinite(row[k]) and np.isfinite(err)):
+            print("[Debug] 龙贝格积分在第 {} 次二分时出现非有限值".format(k))
+            return (row[k], k, evals)
+        if err < delta:
+            return (row[k], k, evals)
+        prev = row
+    print("[Debug] 龙贝格积分在 {} 次二分后仍未达到精度要求".format(max_k))
+    return (prev[-1], max_k, evals)
@@ -0,0 +1,18 @@
+from functools import lru_cache
+import numpy as np
+
+# n 点 Gauss-Legendre 求积公式在区间 [a, b] 上的节点与权重，按 (n, a, b) 缓存，返回只读数组
+@lru_cache(maxsize=128)
+def gauss_legendre(n: int, a: float = -1.0, b: float = 1.0):
+    x, w = np.polynomial.legendre.leggauss(n)
+    x = ((b - a) / 2) * x + ((b + a) / 2)
+    w = ((b - a) / 2) * w
+    x.setflags(write=False)
+    w.setflags(write=False)
+    return (x, w)
+
+# 在同一组节点上一次计算一批函数的积分
+# fn(x) 返回形状为 (m, n) 的数组，每一行为一个被积函数在节点上的值，结果为长度 m 的数组
+def gauss_integrate(fn, n: int, a: float = -1.0, b: float = 1.0):
+    x, w = gauss_legendre(n, a, b)
+    return fn(x) @ w
@@ -1,44 +1,34 @@
 import numpy as np
-from typing import List 
 from sys import path
 path.append('..')
-from point import Point, PolyFn
+from point import SampleSet
+from .piecewise import PiecewisePoly
 
 class Hermite:
-    def __init__(self, samples: List[Point]):
-        self.samples = samples
-        self.poly = []
+    def __init__(self, samples: SampleSet):
+        self.samples = SampleSet.of(samples)
+        self.poly = None
 
     def interp(self):
-        # 根据公式计算区间内的三次插值多项式
-        n = len(self.samples)
-        for i in range(0, n-1):
-            item = np.poly1d([0])
-            x0 = self.samples[i].x 
-            x1 = self.samples[i + 1].x 
-            y0 = self.samples[i].y 
-            y1 = self.samples[i + 1].y 
-            d0 = self.samples[i].d 
-            d1 = self.samples[i + 1].d 
-            item += y0 * (1 + (2 / (x1 - x0)) * np.poly1d([1, -x0])) * (np.poly1d([1, -x1]) / (x0 - x1)) * (np.poly1d([1, -x1]) / (x0 - x1))
-            item += y1 * (1 + (2 / (x0 - x1)) * np.poly1d([1, -x1])) * (np.poly1d([1, -x0]) / (x1 - x0)) * (np.poly1d([1, -x0]) / (x1 - x0))
-            item += d0 * (np.poly1d([1, -x0])) * (np.poly1d([1, -x1]) / (x0 - x1)) * (np.poly1d([1, -x1]) / (x0 - x1))
-            item += d1 * (np.poly1d([1, -x1])) * (np.poly1d([1, -x0]) / (x1 - x0)) * (np.poly1d([1, -x0]) / (x1 - x0))
-            self.poly.append(PolyFn(item, x0, x1))
-    
+        # 根据公式计算区间内的三次插值多项式，并展开为关于 (x - x0) 的系数
+        x = self.samples.x
+        y = self.samples.y
+        d = self.samples.d
+        order = np.argsort(x)
+        x = x[order]
+        y = y[order]
+        d = d[order]
+        h = np.diff(x)
+        d0 = d[:-1]
+        d1 = d[1:]
+        # 区间上的平均斜率
+        s = np.diff(y) / h
+        c3 = (d0 + d1 - 2 * s) / (h * h)
+        c2 = (3 * s - 2 * d0 - d1) / h
+        self.poly = PiecewisePoly(x, np.vstack([c3, c2, d0, y[:-1]]))
+
     def cal(self, x: float):
-            for item in self.poly:
-                if x >= item.a and x <= item.b:
-                    y = item.fn(x)
-                    return y 
-            print("[Debug] 要计算的值不在给定区间中")
-            return 0
+        return self.poly.cal(x)
 
     def vector_cal(self, x):
-        y = []
-        for item_x in x:
-            item_y = self.cal(item_x)
-            y.append(item_y)
-        return y
-
-
+        return self.poly.vector_cal(x)
@@ -1,12 +1,13 @@
 import numpy as np
-from typing import List
 from sys import path
 path.append('..')
-from point import Point
+from point import SampleSet
 
 class Largrange:
-    def __init__(self, samples: List[Point]):
-        self.samples = samples
+    def __init__(self, samples: SampleSet):
+        self.samples = SampleSet.of(samples)
+        # 重心权重，调用 barycentric 时才计算
+        self.weights = None
 
     def interp(self):
         # 求拉格朗日每项的基函数
@@ -17,14 +18,57 @@ class Largrange:
             div_num = 1
             for j in range(0, n):
                 if i != j:
-                    item_fn = item_fn * np.poly1d([1, -self.samples[j].x])
+                    item_fn = item_fn * np.poly1d([1, -self.samples.x[j]])
             for k in range(0, n):
                 if i != k:
-                    div_num = div_num * (self.samples[i].x - self.samples[k].x)
-            item_fn = (item_fn / div_num) * self.samples[i].y
+                    div_num = div_num * (self.samples.x[i] - self.samples.x[k])
+            item_fn = (item_fn / div_num) * self.samples.y[i]
             fn = fn + item_fn
         self.fn = fn
         return fn
 
+    # 重心形式的拉格朗日插值，预先计算重心权重 w_i = 1 / prod(x_i - x_j)
+    def barycentric(self):
+        x = self.samples.x
+        # 按区间长度的四分之一缩放节点差，避免节点较多时权重上溢或下溢，缩放因子在求值时会被约去
+        width = np.max(x) - np.min(x)
+        self.scale = 4 / width if width > 0 else 1.0
+        diff = (x[:, None] - x[None, :]) * self.scale
+        np.fill_diagonal(diff, 1)
+        self.weights = 1 / np.prod(diff, axis=1)
+        self.fn = self.bary_cal
+        return self.fn
+
+    # 增加一个插值节点，只需 O(n) 更新已有权重，尚未计算权重时先计算
+    def add_sample(self, x: float, y: float):
+        if self.weights is None:
+            self.barycentric()
+        if np.any(self.samples.x == x):
+            raise ValueError("插值节点 {} 已存在".format(x))
+        diff = (self.samples.x - x) * self.scale
+        new_weight = 1 / np.prod(-diff)
+        self.weights = np.append(self.weights / diff, new_weight)
+        self.samples = SampleSet(np.append(self.samples.x, x), np.append(self.samples.y, y))
+
+    # 求值点按 chunk 个一组分块计算，中间数组的大小只与 chunk 和节点数有关
+    def bary_cal(self, x, chunk: int = 4096):
+        x = np.asarray(x, dtype=float)
+        shape = x.shape
+        x = x.ravel()
+        nodes = self.samples.x
+        values = self.samples.y
+        y = np.empty(x.shape)
+        for start in range(0, len(x), chunk):
+            diff = x[start:start + chunk, None] - nodes[None, :]
+            # 求值点恰好落在节点上时直接取节点处的函数值
+            exact = diff == 0
+            diff[exact] = 1
+            tmp = self.weights / diff
+            part = (tmp @ values) / np.sum(tmp, axis=1)
+            rows, cols = np.nonzero(exact)
+            part[rows] = values[cols]
+            y[start:start + chunk] = part
+        return y.reshape(shape)
+
     def cal(self, x: float):
         return self.fn(x)
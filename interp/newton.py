@@ -1,58 +1,54 @@
 import numpy as np
-from typing import List
 from sys import path
 path.append('..')
-from point import Point
+from point import SampleSet
 
 class Netwon:
-    def __init__(self, samples: List[Point]):
-        self.table = []
-        self.samples = samples
+    def __init__(self, samples: SampleSet):
+        self.samples = SampleSet.of(samples)
+        # 已加入的插值节点
+        self.nodes = np.zeros(0)
+        # 牛顿插值多项式的系数，即均差表的对角线 f[x0], f[x0, x1], ..., f[x0, ..., xn]
+        self.coef = np.zeros(0)
+        # 均差表的最后一条斜线 f[xn], f[x(n-1), xn], ..., f[x0, ..., xn]
+        self.diag = np.zeros(0)
 
     # 计算均差
     def _div_diff(self, x1: float, x2: float, f1: float, f2: float):
         return (f2 - f1) / (x2 - x1)
-    
-    # 计算均差表
-    def _div_table(self):
-        n = len(self.samples)
-        # 获得0阶均差，即所有采样点的函数值
-        self.table.append([self.samples[i].y for i in range(n)])
-        # 迭代 n - 1 次，获得所有均差值
-        for i in range(1, n):
-            # k 阶差商表
-            k_table = [0 for _ in range(0, i)]
-            for j in range(i, n):
-                # 获得上一级的均差
-                y1 = self.table[i - 1][j - 1]
-                y2 = self.table[i - 1][j]
-                # 获得对应的 x
-                x1 = self.samples[j - i].x;
-                x2 = self.samples[j].x;
-                # 计算均差
-                f = self._div_diff(x1, x2, y1, y2)
-                k_table.append(f)
-            self.table.append(k_table)
-        # print(self.table)
-    
+
+    # 用上一条斜线递推出加入新节点后的斜线，复杂度为 O(n)
+    def _push(self, x: float, y: float):
+        n = len(self.nodes)
+        diag = np.empty(n + 1)
+        diag[0] = y
+        for k in range(1, n + 1):
+            diag[k] = self._div_diff(self.nodes[n - k], x, self.diag[k - 1], diag[k - 1])
+        self.diag = diag
+        self.nodes = np.append(self.nodes, x)
+        self.coef = np.append(self.coef, diag[n])
+
+    # 加入一个新的插值节点，无需重新计算整个均差表；均差表与已有节点不一致时先重新计算
+    def add_sample(self, x: float, y: float):
+        if len(self.nodes) != len(self.samples):
+            self.interp()
+        self._push(x, y)
+        self.samples = SampleSet(np.append(self.samples.x, x), np.append(self.samples.y, y))
+
     # 牛顿插值法计算
     def interp(self):
-        # 获取均差表
-        self._div_table()
-        # 构造多项式参数
-        n = len(self.samples)
-        fn = np.poly1d([0])
-        for i in range(0, n):
-            # 对每一项都构造多项式最后迭代相加
-            item = np.poly1d([self.table[i][i]])
-            for j in range(0, i + 1):
-                if j == 0:
-                    item = item * [1]
-                elif j > 0:
-                    item = item * [1, -self.samples[j - 1].x]
-            fn = fn + item
-        self.fn = fn
-        return fn
+        self.nodes = np.zeros(0)
+        self.coef = np.zeros(0)
+        self.diag = np.zeros(0)
+        for x, y in zip(self.samples.x, self.samples.y):
+            self._push(x, y)
+        self.fn = self.cal
+        return self.fn
 
+    # 按嵌套形式 a0 + (x - x0)(a1 + (x - x1)(a2 + ...)) 求值
     def cal(self, x):
-        return self.fn(x)
\ No newline at end of file
+        x = np.asarray(x, dtype=float)
+        y = np.full_like(x, self.coef[-1])
+        for k in range(len(self.coef) - 2, -1, -1):
+            y = y * (x - self.nodes[k]) + self.coef[k]
+        return y
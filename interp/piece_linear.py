@@ -1,36 +1,26 @@
 import numpy as np
-from typing import List
 from sys import path
 path.append('..')
-from point import Point, PolyFn
+from point import SampleSet
+from .piecewise import PiecewisePoly
 
 class PieceLinear:
-    def __init__(self, samples: List[Point]):
-        self.samples = samples
-        self.poly = []
+    def __init__(self, samples: SampleSet):
+        self.samples = SampleSet.of(samples)
+        self.poly = None
 
     def interp(self):
-        n = len(self.samples)
-        for i in range(0, n-1):
-            # 一阶拉格朗日插值算表达式
-            x1 = self.samples[i].x 
-            x2 = self.samples[i + 1].x 
-            f1 = self.samples[i].y 
-            f2 = self.samples[i + 1].y 
-            fn = (f1 / (x1 - x2)) * np.poly1d([1, -x2]) + (f2 / (x2 - x1)) * np.poly1d([1, -x1])
-            self.poly.append(PolyFn(fn, x1, x2))
+        x = self.samples.x
+        y = self.samples.y
+        order = np.argsort(x)
+        x = x[order]
+        y = y[order]
+        # 一阶拉格朗日插值在区间 [x_i, x_{i+1}] 上写成 y_i + k_i * (x - x_i)
+        k = np.diff(y) / np.diff(x)
+        self.poly = PiecewisePoly(x, np.vstack([k, y[:-1]]))
 
     def cal(self, x: float):
-        for item in self.poly:
-            if x >= item.a and x <= item.b:
-                y = item.fn(x)
-                return y 
-        print("[Debug] 要计算的值不在给定区间中")
-        return 0
+        return self.poly.cal(x)
 
     def vector_cal(self, x):
-        y = []
-        for item_x in x:
-            item_y = self.cal(item_x)
-            y.append(item_y)
-        return y
\ No newline at end of file
+        return self.poly.vector_cal(x)
@@ -0,0 +1,30 @@
+import numpy as np
+
+class PiecewisePoly:
+    def __init__(self, knots, coef):
+        # 区间端点，要求递增
+        self.knots = np.ascontiguousarray(knots, dtype=float)
+        # 系数矩阵，第 i 列为第 i 个区间上关于 (x - knots[i]) 的多项式系数，高次项在前
+        self.coef = np.ascontiguousarray(coef, dtype=float)
+
+    def vector_cal(self, x):
+        x = np.asarray(x, dtype=float)
+        shape = x.shape
+        x = x.ravel()
+        knots = self.knots
+        # 二分查找每个点所在的区间
+        idx = np.searchsorted(knots, x, side='right') - 1
+        idx = np.clip(idx, 0, len(knots) - 2)
+        t = x - knots[idx]
+        # 使用秦九韶算法(Horner)计算多项式的值
+        y = np.zeros_like(t)
+        for row in self.coef:
+            y = y * t + row[idx]
+        outside = (x < knots[0]) | (x > knots[-1])
+        if np.any(outside):
+            print("[Debug] 要计算的值不在给定区间中")
+            y[outside] = 0
+        return y.reshape(shape)
+
+    def cal(self, x: float):
+        return self.vector_cal(np.array([x]))[0]
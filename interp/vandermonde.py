@@ -1,31 +1,37 @@
 import numpy as np
-from typing import List
 from sys import path
 path.append('..')
-from point import Point 
+from point import SampleSet
 
 
 class Vandermonde:
-    def __init__(self, samples: List[Point]):
-        self.samples = samples
+    def __init__(self, samples: SampleSet):
+        self.samples = SampleSet.of(samples)
 
-    def interp(self):
-        # 生成矩阵
-        samples = self.samples
-        n = len(samples)
-        matrix = []
-        y = np.transpose(np.array([samples[i].y for i in range(n)]))
-        for i, sample in enumerate(samples):
-            if i == 0:
-                matrix = np.array([[pow(sample.x, i) for i in range(n)]])
-            else:
-                matrix = np.append(matrix, [[pow(sample.x, i) for i in range(n)]], axis=0)
-        # 计算范德蒙矩阵矩阵的结果   
-        res = list(reversed(np.linalg.solve(matrix, y)))
+    # Björck-Pereyra 算法求解范德蒙德方程组，先由均差得到牛顿形式的系数，再展开为单项式系数，
+    # 时间复杂度 O(n^2)，只需 O(n) 的额外空间，且不需要构造矩阵
+    def _bjorck_pereyra(self):
+        x = self.samples.x
+        a = np.array(self.samples.y, dtype=float)
+        n = len(x) - 1
+        for k in range(0, n):
+            a[k + 1:] = (a[k + 1:] - a[k:n]) / (x[k + 1:] - x[:n - k])
+        for k in range(n - 1, -1, -1):
+            a[k:n] -= a[k + 1:] * x[k]
+        return a
+
+    def interp(self, fast: bool = False):
+        if fast:
+            res = self._bjorck_pereyra()
+        else:
+            # 生成矩阵
+            matrix = np.vander(self.samples.x, increasing=True)
+            # 计算范德蒙矩阵矩阵的结果
+            res = np.linalg.solve(matrix, self.samples.y)
         # 获取对应的多项式函数
-        fn = np.poly1d(res)
+        fn = np.poly1d(res[::-1])
         self.fn = fn
         return fn
 
     def cal(self, x: float):
-        return self.fn(x)
\ No newline at end of file
+        return self.fn(x)
@@ -1,21 +1,126 @@
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from scipy import sparse
+from scipy.sparse.linalg import spsolve
+from .precond import make_precond
+
+try:
+    # 安装了 numba 时对稀疏迭代的内层循环进行即时编译
+    from numba import njit
+except ImportError:
+    def njit(fn):
+        return fn
+
+# 前代求解 Ly = b，L 为单位下三角矩阵(只使用严格下三角部分)，b 的每一列为一个右端项
+def _forward_substitution(L, b):
+    y = np.array(b, dtype=float)
+    n = L.shape[-1]
+    for i in range(1, n):
+        y[..., i, :] -= (L[..., i:i + 1, :i] @ y[..., :i, :])[..., 0, :]
+    return y
+
+# 回代求解 Ux = y，U 为上三角矩阵(只使用上三角部分)，y 的每一列为一个右端项
+def _back_substitution(U, y):
+    x = np.array(y, dtype=float)
+    n = U.shape[-1]
+    for i in range(n - 1, -1, -1):
+        x[..., i, :] -= (U[..., i:i + 1, i + 1:] @ x[..., i + 1:, :])[..., 0, :]
+        x[..., i, :] /= U[..., i, i, None]
+    return x
+
+
+# 列主元 LU 分解 PA = LU，分解一次后可对任意多个右端项求解
+# matrix 可以是单个 (n, n) 矩阵，也可以是一批 (batch, n, n) 矩阵
+class LUFactor:
+    # block 为分块的列数，采用右视分块算法：先对宽为 block 的列块做选主元分解，
+    # 再用三角求解得到 U 的对应行块，最后以一次矩阵乘法更新右下角的剩余子矩阵
+    def __init__(self, matrix, block: int = 64):
+        A = np.array(matrix, dtype=float)
+        self.batched = A.ndim == 3
+        self.n = A.shape[-1]
+        n = self.n
+        # 统一按 (batch, n, n) 处理
+        A = A.reshape(-1, n, n)
+        batch = np.arange(A.shape[0])
+        perm = np.tile(np.arange(n), (A.shape[0], 1))
+        for j0 in range(0, n, block):
+            j1 = min(j0 + block, n)
+            for i in range(j0, j1):
+                # 按绝对值选取列主元并交换整行
+                p = np.argmax(np.abs(A[:, i:, i]), axis=1) + i
+                row = A[batch, i, :].copy()
+                A[batch, i, :] = A[batch, p, :]
+                A[batch, p, :] = row
+                index = perm[batch, i].copy()
+                perm[batch, i] = perm[batch, p]
+                perm[batch, p] = index
+                if np.any(A[:, i, i] == 0):
+                    raise np.linalg.LinAlgError("矩阵奇异，无法进行 LU 分解")
+                # 在当前列块内做秩 1 更新，L 与 U 紧凑地存放在同一个数组中
+                A[:, i + 1:, i] /= A[:, i, i, None]
+                A[:, i + 1:, i + 1:j1] -= A[:, i + 1:, i, None] * A[:, i, None, i + 1:j1]
+            if j1 < n:
+                # U12 = L11^{-1} A12，A22 -= L21 U12
+                A[:, j0:j1, j1:] = _forward_substitution(A[:, j0:j1, j0:j1], A[:, j0:j1, j1:])
+                A[:, j1:, j1:] -= A[:, j1:, j0:j1] @ A[:, j0:j1, j1:]
+        self.lu = A
+        self.perm = perm
+
+    # 返回 (P, L, U)，满足 P @ A = L @ U
+    def factors(self):
+        n = self.n
+        L = np.tril(self.lu, -1) + np.eye(n)
+        U = np.triu(self.lu)
+        P = np.eye(n)[self.perm]
+        if not self.batched:
+            return (P[0], L[0], U[0])
+        return (P, L, U)
+
+    # b 的形状可以为 (n,) 或 (n, k)，批量模式下为 (batch, n) 或 (batch, n, k)
+    def solve(self, b):
+        b = np.array(b, dtype=float)
+        shape = b.shape
+        b = b.reshape(self.lu.shape[0], self.n, -1)
+        # 按主元交换的顺序重排右端项
+        b = np.take_along_axis(b, self.perm[:, :, None], axis=1)
+        y = _forward_substitution(self.lu, b)
+        x = _back_substitution(self.lu, y)
+        return x.reshape(shape)
+
+# 对 CSR 格式的稀疏矩阵做一次 SOR 扫描(omega = 1 时即为高斯-塞德尔)，只访问存储的非零元
+# 原地更新 x，并返回本次扫描中分量的最大变化量
+@njit
+def _csr_sor_sweep(indptr, indices, data, diag, b, x, omega):
+    max_err = 0.0
+    for i in range(len(b)):
+        s = 0.0
+        for p in range(indptr[i], indptr[i + 1]):
+            s += data[p] * x[indices[p]]
+        dx = omega * (b[i] - s) / diag[i]
+        x[i] += dx
+        if abs(dx) > max_err:
+            max_err = abs(dx)
+    return max_err
+
 
 class Matrix:
     def __init__(self, matrix, vector):
+        # 系数矩阵可以是稠密数组，也可以是 scipy 的稀疏矩阵(统一转换为 CSR 格式)
+        self.sparse = sparse.issparse(matrix)
+        if self.sparse:
+            matrix = sparse.csr_matrix(matrix, dtype=float)
+            matrix.sort_indices()
+            self.diag = matrix.diagonal()
         self.matrix = matrix
         self.vector = vector
-        self.m = len(self.matrix)
+        self.m = self.matrix.shape[0] if self.sparse else len(self.matrix)
         self.n = self.m
 
-    def _swap_matrix_row(self, i: int, j: int):
-        temp = self.matrix[i].copy()
-        self.matrix[i] = self.matrix[j]
-        self.matrix[j] = temp
-
-    def _swap_vector_row(self, i: int, j: int):
-        temp = self.vector[i].copy()
-        self.vector[i] = self.vector[j]
-        self.vector[j] = temp
+    # 直接解法需要稠密矩阵
+    def _dense(self):
+        if self.sparse:
+            return self.matrix.toarray()
+        return self.matrix
 
     def random_non_singular_matrix(size):
         random_matrix = np.random.rand(size, size) * 100
@@ -24,77 +129,77 @@ class Matrix:
 
     # 以列为主元的高斯消元法
     def _gaussian_elimination(self):
+        # 在副本上消元，保证同一个对象可以多次求解
+        matrix = np.array(self._dense(), dtype=float)
+        vector = np.array(self.vector, dtype=float)
         for i in range(0, self.m):
-            # 从第 0 行 至最后一行进行消元
-            max_element = self.matrix[i][i]
-            max_pos = i
-            for j in range(i + 1, self.m):
-                # 从当前行向后寻找最大的主元
-                if self.matrix[j][i] > max_element:
-                    max_element = self.matrix[j][i]
-                    max_pos = j 
+            # 从当前行向后按绝对值寻找最大的主元
+            max_pos = i + np.argmax(np.abs(matrix[i:, i]))
             if max_pos != i:
                 # 如果最大的列元素不在当前行，则交换当前行与列元素最大所在行
-                self._swap_matrix_row(i, max_pos)
-                self._swap_vector_row(i, max_pos)
-            
-            # 交换行之后进行高斯消元
-            for k in range(i + 1, self.m):
-                # 计算消元系数
-                a_k = self.matrix[k][i] / self.matrix[i][i]
-                self.matrix[k] -= a_k * self.matrix[i]
-                self.vector[k] -= a_k * self.vector[i]
-        
+                matrix[[i, max_pos]] = matrix[[max_pos, i]]
+                vector[[i, max_pos]] = vector[[max_pos, i]]
+            # 交换行之后一次性对下方所有行做秩 1 更新完成消元
+            factor = matrix[i + 1:, i] / matrix[i, i]
+            matrix[i + 1:, i:] -= np.outer(factor, matrix[i, i:])
+            vector[i + 1:] -= factor * vector[i]
+
         # 消元后进行回代
-        res = []
-        for i in range(0, self.m):
-            index = self.m - i - 1
-            x = self.vector[index]
-            for j in range(0, i):
-                yindex = self.m - j - 1
-                x -= res[j] * self.matrix[index][yindex]
-            x = x / self.matrix[index][index]
-            res.append(x)
-        res = list(reversed(res))
+        res = _back_substitution(matrix, vector.reshape(self.m, -1))
+        res = list(res.reshape(vector.shape))
         return res
 
     def gaussian_slove(self):
         return self._gaussian_elimination()
 
-    # LU 矩阵分解
+    # 列主元 LU 矩阵分解，返回 (P, L, U, x)，P 为行置换矩阵，L 为单位下三角矩阵，U 为上三角矩阵，满足 P A = L U
     def _LU_decomposition(self):
-        # 初始化 LU 矩阵
-        L = np.array([[0.0 for _ in range(0, self.m)] for _ in range(0, self.m)])
-        U = np.array([[0.0 for _ in range(0, self.m)] for _ in range(0, self.m)])
-
-        # 迭代求解 LU 矩阵的系数
-        for r in range(0, self.m):
-            L[r][r] = 1
-            if r == 0:
-                U[0] = self.matrix[0]
-                for i in range(1, self.m):
-                    L[i][0] = self.matrix[i][0] / U[0][0]
-            else:
-                for i in range(r, self.m):
-                    sum = 0
-                    for k in range(0, r):
-                        sum += L[r][k] * U[k][i]
-                    U[r][i] = self.matrix[r][i] - sum
-                for i in range(r + 1, self.m):
-                    sum = 0
-                    for k in range(0, r):
-                        sum += L[i][k] * U[k][r]
-                    L[i][r] = (self.matrix[i][r] - sum) / U[r][r]
-        y = np.linalg.solve(L, self.vector)
-        x = np.linalg.solve(U, y)
-        return (L, U, x)
-                    
+        factor = self.lu_factor()
+        P, L, U = factor.factors()
+        x = factor.solve(self.vector)
+        return (P, L, U, x)
 
     def LU_decomposition_slove(self):
         return self._LU_decomposition()
 
+    # 对系数矩阵做一次列主元 LU 分解，之后可以反复对不同的右端项求解
+    def lu_factor(self):
+        return LUFactor(self._dense())
+
+    # 一次求解多个右端项，vectors 的每一列为一个右端项
+    def multi_slove(self, vectors):
+        return self.lu_factor().solve(vectors)
+
+    # 同时求解一批小规模方程组，matrices 形状为 (batch, n, n)，vectors 形状为 (batch, n) 或 (batch, n, k)
+    @staticmethod
+    def batch_slove(matrices, vectors):
+        return LUFactor(matrices).solve(vectors)
+
+    # 做一次 SOR 扫描，原地更新 x 并返回分量的最大变化量
+    # 稀疏矩阵每次扫描的代价与非零元个数成正比
+    def _sor_sweep(self, x, omega):
+        if self.sparse:
+            A = self.matrix
+            b = np.asarray(self.vector, dtype=float)
+            return _csr_sor_sweep(A.indptr, A.indices, A.data, self.diag, b, x, omega)
+        max_err = 0.0
+        for i in range(self.n):
+            old_sum = 0.0
+            new_sum = 0.0
+            for j in range(0, i):
+                new_sum += self.matrix[i][j] * x[j]
+            for j in range(i, self.n):
+                old_sum += self.matrix[i][j] * x[j]
+            old_xi = x[i]
+            x[i] = x[i] + omega * (self.vector[i] - old_sum - new_sum)/self.matrix[i][i]
+            err = abs(x[i] - old_xi)
+            max_err = max(max_err, err)
+        return max_err
+
     # 高斯-塞德尔迭代
     def gauss_seidel(self, x0, delta):
+        if self.sparse:
+            return self.sor(x0, 1.0, delta)
         x = x0  
         count = 0
         while True:  
@@ -122,25 +227,225 @@ class Matrix:
         count = 0
         while True:  
             count += 1
-            max_err = 0.0
-            for i in range(self.n):
-                old_sum = 0.0
-                new_sum = 0.0
-                for j in range(0, i):
-                    new_sum += self.matrix[i][j] * x[j]
-                for j in range(i, self.n):
-                    old_sum += self.matrix[i][j] * x[j]
-                old_xi = x[i]
-                x[i] = x[i] + omega * (self.vector[i] - old_sum - new_sum)/self.matrix[i][i]
-                err = abs(x[i] - old_xi)
-                max_err = max(max_err, err)
+            max_err = self._sor_sweep(x, omega)
             if max_err < delta:
                 break
-            max_err = 0
         return (x, count)
 
+    # 自动选取松弛因子的 SOR 迭代
+    # 先做高斯-塞德尔扫描，用相邻两次修正量(2-范数)之比估计其收敛因子 ρ(G) = ρ(J)^2，
+    # 估计值相对 1 - ρ(G) 稳定后取 omega = 2 / (1 + sqrt(1 - ρ(G)))，返回 (x, count, omega)
+    def adaptive_sor(self, x0, delta, tol: float = 0.01, max_warmup: int = 200):
+        x = x0
+        count = 0
+        omega = 1.0
+        prev_norm = None
+        rho = None
+        while True:
+            count += 1
+            old_x = np.array(x, dtype=float)
+            max_err = self._sor_sweep(x, 1.0)
+            if max_err < delta:
+                return (x, count, omega)
+            norm = np.linalg.norm(x - old_x)
+            if prev_norm is not None and prev_norm > 0:
+                ratio = norm / prev_norm
+                stable = rho is not None and abs(ratio - rho) < tol * abs(1 - ratio)
+                rho = ratio
+                if stable or count >= max_warmup:
+                    break
+            prev_norm = norm
+        # 估计值不小于 1 时高斯-塞德尔迭代本身不收敛，此时保持 omega = 1
+        if rho < 1:
+            omega = 2 / (1 + np.sqrt(1 - rho))
+        while True:
+            count += 1
+            max_err = self._sor_sweep(x, omega)
+            if max_err < delta:
+                break
+        return (x, count, omega)
+
+    # 按矩阵非零元构成的图做贪心着色，同一颜色的未知量之间没有耦合
+    # 对五点差分等结构化网格，按自然顺序着色即得到红黑排序
+    def coloring(self):
+        A = sparse.csr_matrix(self.matrix)
+        G = sparse.csr_matrix(A + A.T)
+        color = np.full(self.n, -1)
+        for i in range(self.n):
+            neighbor = color[G.indices[G.indptr[i]:G.indptr[i + 1]]]
+            used = set(neighbor[neighbor >= 0])
+            c = 0
+            while c in used:
+                c += 1
+            color[i] = c
+        return [np.nonzero(color == c)[0] for c in range(color.max() + 1)]
+
+    # 多色高斯-塞德尔(omega != 1 时为多色 SOR)迭代
+    # 每种颜色的未知量作为一块整体向量化更新，workers > 1 时把每块再拆分到线程池中并行计算，
+    # 各线程只写入 x 中互不相交的分量。colors 为各颜色包含的下标，缺省时自动着色
+    def multicolor_gauss_seidel(self, x0, delta, omega: float = 1.0, workers: int = 1, colors=None):
+        A = sparse.csr_matrix(self.matrix, dtype=float)
+        b = np.asarray(self.vector, dtype=float)
+        diag = A.diagonal()
+        if colors is None:
+            colors = self.coloring()
+        # 每种颜色拆分为若干块，跳过不含任何下标的颜色
+        groups = []
+        for index in colors:
+            parts = [part for part in np.array_split(np.asarray(index, dtype=int), workers) if len(part) > 0]
+            if len(parts) > 0:
+                groups.append([(part, A[part], diag[part], b[part]) for part in parts])
+        x = x0
+        count = 0
+
+        def update(block):
+            part, rows, d, rhs = block
+            dx = omega * (rhs - rows @ x) / d
+            x[part] += dx
+            return np.max(np.abs(dx))
+
+        # 只有 workers > 1 时才创建线程池
+        pool = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+        try:
+            while True:
+                count += 1
+                max_err = 0.0
+                # 同一颜色的块互不依赖，可以并行；不同颜色之间按顺序更新
+                for blocks in groups:
+                    if pool is not None:
+                        errs = list(pool.map(update, blocks))
+                    else:
+                        errs = [update(block) for block in blocks]
+                    max_err = max(max_err, max(errs))
+                if max_err < delta:
+                    break
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        return (x, count)
+
+    # 以下 Krylov 子空间方法以残差 ||b - Ax|| < delta * ||b|| 作为收敛条件
+    # precond 可以为 None, 'jacobi', 'ssor', 'ilu' 或带有 apply 方法的对象
+    # 返回 (x, count, history)，history 为每次迭代的残差范数
+    def _krylov_init(self, x0, precond, max_iter):
+        x = np.array(x0, dtype=float)
+        b = np.asarray(self.vector, dtype=float)
+        M = make_precond(self.matrix, precond)
+        if max_iter is None:
+            max_iter = 10 * self.n
+        return (x, b, M, max_iter)
+
+    # 预条件共轭梯度法，适用于对称正定矩阵
+    def cg(self, x0, delta, precond=None, max_iter=None):
+        x, b, M, max_iter = self._krylov_init(x0, precond, max_iter)
+        tol = delta * np.linalg.norm(b)
+        r = b - self.matrix @ x
+        z = M.apply(r)
+        p = z.copy()
+        rz = r @ z
+        history = [np.linalg.norm(r)]
+        count = 0
+        while history[-1] >= tol and count < max_iter:
+            count += 1
+            Ap = self.matrix @ p
+            alpha = rz / (p @ Ap)
+            x += alpha * p
+            r -= alpha * Ap
+            history.append(np.linalg.norm(r))
+            z = M.apply(r)
+            rz_new = r @ z
+            p = z + (rz_new / rz) * p
+            rz = rz_new
+        return (x, count, history)
+
+    # 重启的 GMRES 方法(右预条件)，适用于一般的非奇异矩阵
+    def gmres(self, x0, delta, precond=None, restart: int = 30, max_iter=None):
+        x, b, M, max_iter = self._krylov_init(x0, precond, max_iter)
+        tol = delta * np.linalg.norm(b)
+        r = b - self.matrix @ x
+        beta = np.linalg.norm(r)
+        history = [beta]
+        count = 0
+        while beta >= tol and count < max_iter:
+            m = restart
+            V = np.zeros((m + 1, self.n))
+            Z = np.zeros((m, self.n))
+            H = np.zeros((m + 1, m))
+            cs = np.zeros(m)
+            sn = np.zeros(m)
+            g = np.zeros(m + 1)
+            g[0] = beta
+            V[0] = r / beta
+            k = 0
+            while k < m and count < max_iter:
+                count += 1
+                # Arnoldi 过程，使用修正的 Gram-Schmidt 正交化
+                Z[k] = M.apply(V[k])
+                w = self.matrix @ Z[k]
+                for i in range(0, k + 1):
+                    H[i, k] = w @ V[i]
+                    w -= H[i, k] * V[i]
+                H[k + 1, k] = np.linalg.norm(w)
+                if H[k + 1, k] != 0:
+                    V[k + 1] = w / H[k + 1, k]
+                # 用 Givens 旋转把 H 化为上三角阵，同时得到当前残差
+                for i in range(0, k):
+                    temp = cs[i] * H[i, k] + sn[i] * H[i + 1, k]
+                    H[i + 1, k] = -sn[i] * H[i, k] + cs[i] * H[i + 1, k]
+                    H[i, k] = temp
+                rho = np.hypot(H[k, k], H[k + 1, k])
+                cs[k] = H[k, k] / rho
+                sn[k] = H[k + 1, k] / rho
+                H[k, k] = rho
+                H[k + 1, k] = 0
+                g[k + 1] = -sn[k] * g[k]
+                g[k] = cs[k] * g[k]
+                k += 1
+                history.append(abs(g[k]))
+                if abs(g[k]) < tol:
+                    break
+            y = _back_substitution(H[:k, :k], g[:k, None])[:, 0]
+            x += y @ Z[:k]
+            r = b - self.matrix @ x
+            beta = np.linalg.norm(r)
+        return (x, count, history)
+
+    # 预条件稳定双共轭梯度法，适用于一般的非奇异矩阵
+    def bicgstab(self, x0, delta, precond=None, max_iter=None):
+        x, b, M, max_iter = self._krylov_init(x0, precond, max_iter)
+        tol = delta * np.linalg.norm(b)
+        r = b - self.matrix @ x
+        r_hat = r.copy()
+        rho = alpha = omega = 1.0
+        v = np.zeros_like(r)
+        p = np.zeros_like(r)
+        history = [np.linalg.norm(r)]
+        count = 0
+        while history[-1] >= tol and count < max_iter:
+            count += 1
+            rho_new = r_hat @ r
+            p = r + (rho_new / rho) * (alpha / omega) * (p - omega * v)
+            y = M.apply(p)
+            v = self.matrix @ y
+            alpha = rho_new / (r_hat @ v)
+            s = r - alpha * v
+            if np.linalg.norm(s) < tol:
+                x += alpha * y
+                history.append(np.linalg.norm(s))
+                break
+            z = M.apply(s)
+            t = self.matrix @ z
+            omega = (t @ s) / (t @ t)
+            x += alpha * y + omega * z
+            r = s - omega * t
+            rho = rho_new
+            history.append(np.linalg.norm(r))
+        return (x, count, history)
+
     # 使用 numpy 计算的线性方程组的解，用来和我们计算的比较
     def slove(self):
+        if self.sparse:
+            return spsolve(self.matrix.tocsc(), self.vector)
         return np.linalg.solve(self.matrix, self.vector)
 
 
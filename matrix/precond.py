@@ -0,0 +1,80 @@
+import numpy as np
+from scipy import sparse
+from scipy.sparse.linalg import spsolve_triangular
+
+# 预条件子，apply(r) 计算 M^{-1} r
+
+# Jacobi 预条件，M = D
+class JacobiPrecond:
+    def __init__(self, matrix):
+        self.inv_diag = 1 / sparse.csr_matrix(matrix).diagonal()
+
+    def apply(self, r):
+        return self.inv_diag * r
+
+
+# 对称逐次超松弛预条件，M = (D + ωL) D^{-1} (D + ωU) / (ω(2 - ω))
+class SSORPrecond:
+    def __init__(self, matrix, omega: float = 1.0):
+        A = sparse.csr_matrix(matrix)
+        self.omega = omega
+        self.diag = A.diagonal()
+        D = sparse.diags(self.diag)
+        self.lower = sparse.csr_matrix(D + omega * sparse.tril(A, -1))
+        self.upper = sparse.csr_matrix(D + omega * sparse.triu(A, 1))
+
+    def apply(self, r):
+        omega = self.omega
+        y = spsolve_triangular(self.lower, omega * (2 - omega) * r, lower=True)
+        return spsolve_triangular(self.upper, self.diag * y, lower=False)
+
+
+# 零填充的不完全 LU 分解预条件 ILU(0)，L 与 U 只在 A 的非零位置上取值
+# 对称正定的 M 矩阵得到的预条件子同样对称正定，可以用于共轭梯度法
+class ILUPrecond:
+    def __init__(self, matrix):
+        A = sparse.csr_matrix(matrix, dtype=float, copy=True)
+        A.sort_indices()
+        indptr, indices, data = A.indptr, A.indices, A.data
+        n = A.shape[0]
+        diag_pos = np.zeros(n, dtype=int)
+        for i in range(n):
+            row = indices[indptr[i]:indptr[i + 1]]
+            diag_pos[i] = indptr[i] + np.searchsorted(row, i)
+        for i in range(n):
+            # 第 i 行中各列所在的位置
+            pos = {indices[p]: p for p in range(indptr[i], indptr[i + 1])}
+            for p in range(indptr[i], diag_pos[i]):
+                k = indices[p]
+                data[p] /= data[diag_pos[k]]
+                for q in range(diag_pos[k] + 1, indptr[k + 1]):
+                    j = pos.get(indices[q])
+                    if j is not None:
+                        data[j] -= data[p] * data[q]
+        self.lower = sparse.csr_matrix(sparse.tril(A, -1) + sparse.identity(n))
+        self.upper = sparse.csr_matrix(sparse.triu(A))
+
+    def apply(self, r):
+        y = spsolve_triangular(self.lower, r, lower=True, unit_diagonal=True)
+        return spsolve_triangular(self.upper, y, lower=False)
+
+
+# 不使用预条件
+class IdentityPrecond:
+    def apply(self, r):
+        return r
+
+
+# 根据名字构造预条件子，也可以直接传入带有 apply 方法的对象
+def make_precond(matrix, precond):
+    if precond is None:
+        return IdentityPrecond()
+    if precond == 'jacobi':
+        return JacobiPrecond(matrix)
+    if precond == 'ssor':
+        return SSORPrecond(matrix)
+    if precond == 'ilu':
+        return ILUPrecond(matrix)
+    if hasattr(precond, 'apply'):
+        return precond
+    raise ValueError("未知的预条件子: {}".format(precond))
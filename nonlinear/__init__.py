@@ -1,106 +1,474 @@
-from scipy.misc import derivative
 import numpy as np
-from sympy import symbols, diff
+from sympy import symbols, diff, lambdify
+
+# 数值导数，默认使用中心差分，步长随 |x| 缩放。
+# complex_step 为 True 时使用复步长求导 f'(x) = Im f(x + ih) / h，没有相减带来的舍入误差，
+# 但要求 fn 在 x 附近解析，含 abs、取实部等运算时结果是错误的，因此只在调用方明确要求时使用
+def derivative(fn, x, dx: float = 6e-6, complex_step: bool = False):
+    if complex_step:
+        return np.imag(fn(x + 1e-20j)) / 1e-20
+    h = dx * max(1.0, abs(x))
+    return (fn(x + h) - fn(x - h)) / (2 * h)
 
 class NonLinear:
-    def __init__(self, funcs):
+    # jacobian 为可选的雅可比矩阵函数 J(x)，返回 (n, n) 的数组；
+    # 不提供时先尝试用 sympy 对 funcs 做符号求导，失败时退化为前向差分
+    def __init__(self, funcs, jacobian = None):
         self.funcs = funcs
+        self.jacobian = jacobian
+        # 符号求导成功时同时把方程组编译为 numpy 函数
+        self.compiled = None
+        # 是否已经尝试过符号求导
+        self.traced = False
+        # 方程组的求值次数
+        self.evals = 0
 
     def fn(self, x):
         return self.funcs[0](x)
 
     def Fn(self, x):
+        self._trace()
+        self.evals += 1
+        if self.compiled is not None:
+            return self.compiled(x)
         return np.array([self.funcs[i](x) for i in range(len(self.funcs))])
 
-    def Jacobian(self, x):
+    # 将 funcs 作用于 sympy 符号得到表达式，用 diff 求出每个偏导数，再把方程组与雅可比矩阵经 lambdify 编译为 numpy 函数；
+    # 符号取为实数，避免 abs 等函数求导后出现 re、im 导致无法编译。
+    # funcs 中使用了 math 函数或分支等无法作用于符号的运算，或编译失败时保持原样，退化为前向差分
+    def _trace(self):
+        if self.traced:
+            return
+        self.traced = True
+        num = len(self.funcs)
+        xs = symbols('x0:{}'.format(num), real=True)
+        # 只对表达式中出现的变量求偏导，其余元素恒为 0，只编译非零元素
+        rows, cols, entries = [], [], []
+        try:
+            exprs = [self.funcs[i](xs) for i in range(num)]
+            for i in range(num):
+                free = getattr(exprs[i], 'free_symbols', set())
+                for j in range(num):
+                    if xs[j] in free:
+                        rows.append(i)
+                        cols.append(j)
+                        entries.append(diff(exprs[i], xs[j]))
+            F = lambdify([xs], exprs, 'numpy')
+            fn = lambdify([xs], entries, 'numpy')
+        except Exception:
+            return
+        self.compiled = lambda x: np.array(F(x), dtype=float)
+        if self.jacobian is None:
+            def jacobian(x):
+                J = np.zeros((num, num), dtype=float)
+                J[rows, cols] = fn(x)
+                return J
+            self.jacobian = jacobian
+
+    # 前向差分，每一列只扰动一个分量，共 n + 1 次方程组求值
+    def _difference_jacobian(self, x):
+        x = np.asarray(x, dtype=float)
         num = len(self.funcs)
-        df = np.zeros((num,num),dtype=float)
-        dx = 1e-8   
-        x1 = np.copy(x)
-        for i in range(0,num):
-            for j in range(0,num):
-                x1 = np.copy(x)
-                x1[j] = x1[j] + dx   
-                df[i,j] = (self.Fn(x1)[i] - self.Fn(x)[i])/dx
-        df_rev = np.linalg.inv(df)
-        return df_rev
-
-
-    # 不动点迭代, x0 为初始点, delta 为要求的误差值
-    def fixed_iter(self, x0, delta):
+        F = self.Fn(x)
+        df = np.zeros((num, num), dtype=float)
+        for j in range(0, num):
+            dx = 1.5e-8 * max(1.0, abs(x[j]))
+            x1 = np.copy(x)
+            x1[j] = x1[j] + dx
+            df[:, j] = (self.Fn(x1) - F) / dx
+        return df
+
+    def Jacobian(self, x):
+        self._trace()
+        if self.jacobian is not None:
+            return np.asarray(self.jacobian(x), dtype=float)
+        return self._difference_jacobian(x)
+
+
+    # 迭代值出现 nan 或 inf 时认为迭代发散
+    def _diverged(self, x, count):
+        if np.all(np.isfinite(x)):
+            return False
+        print("[Debug] 迭代在第 {} 次时发散".format(count))
+        return True
+
+    # math 中的函数溢出或超出定义域时抛出异常而不是返回 inf 或 nan，同样视为发散
+    def _failed(self, count):
+        print("[Debug] 迭代在第 {} 次时求值溢出或超出定义域".format(count))
+
+    # 不动点迭代, x0 为初始点, delta 为要求的误差值, max_iter 为最大迭代次数
+    def fixed_iter(self, x0, delta, max_iter: int = 1000):
         x = x0
         next_x = x0
         count = 0
-        while True:
-            next_x = self.fn(x)
+        while count < max_iter:
+            try:
+                next_x = self.fn(x)
+            except (OverflowError, ValueError):
+                self._failed(count)
+                break
+            if self._diverged(next_x, count):
+                break
             err = abs(x - next_x)
             if err < delta:
                 break
             else:
                 x = next_x
             count += 1
+        else:
+            print("[Debug] 不动点迭代在 {} 次迭代内未收敛".format(max_iter))
         return (next_x, count)
     
     # 斯蒂芬森迭代法
-    def stefenson_iter(self, x0, delta):
+    def stefenson_iter(self, x0, delta, max_iter: int = 1000):
         x = x0
         y = x0
         z = x0
         next_x = x0
         count = 0
-        while True:
-            y = self.fn(x)
-            z = self.fn(y)
-            next_x = x - ((y - x)*(y - x) / (z - 2*y +x))
+        while count < max_iter:
+            try:
+                y = self.fn(x)
+                z = self.fn(y)
+            except (OverflowError, ValueError):
+                self._failed(count)
+                break
+            denom = z - 2*y + x
+            # 分母为 0 时若 y = x 则 x 已是不动点，否则无法继续迭代
+            if denom == 0:
+                next_x = y
+                if y != x:
+                    print("[Debug] 斯蒂芬森迭代在第 {} 次时分母为 0".format(count))
+                break
+            next_x = x - ((y - x)*(y - x) / denom)
+            if self._diverged(next_x, count):
+                break
             err = abs(next_x - x)
             if err < delta:
                 break
             else:
                 x = next_x
             count += 1
+        else:
+            print("[Debug] 斯蒂芬森迭代在 {} 次迭代内未收敛".format(max_iter))
         return (next_x, count)
 
-    # 牛顿迭代法
-    def newton_iter(self, x0, delta):
+    # 牛顿迭代法，dfn 为可选的导函数，不提供时用数值导数，complex_step 为 True 时使用复步长求导
+    def newton_iter(self, x0, delta, max_iter: int = 1000, dfn=None, complex_step: bool = False):
         x = x0
         next_x = x0
         count = 0
-        while True:
-            next_x = x - (self.fn(x)/derivative(self.fn, x))
+        while count < max_iter:
+            try:
+                d = dfn(x) if dfn is not None else derivative(self.fn, x, complex_step=complex_step)
+                if d == 0:
+                    print("[Debug] 牛顿迭代在第 {} 次时导数为 0".format(count))
+                    break
+                next_x = x - (self.fn(x)/d)
+            except (OverflowError, ValueError):
+                self._failed(count)
+                break
+            if self._diverged(next_x, count):
+                break
             err = abs(next_x - x)
             if err < delta:
                 break 
             else: 
                 x = next_x
             count += 1
+        else:
+            print("[Debug] 牛顿迭代在 {} 次迭代内未收敛".format(max_iter))
         return (next_x, count)
 
+    # Brent 方法，要求 fn(a) 与 fn(b) 异号。
+    # 始终保持一个有根区间，优先使用逆二次插值或割线法，步长不够理想时退回二分法，
+    # 因此一定收敛，且在根附近为超线性收敛
+    def brent(self, a, b, delta, max_iter: int = 100):
+        fa = self.fn(a)
+        fb = self.fn(b)
+        if fa * fb > 0:
+            raise ValueError("区间 [{}, {}] 两端的函数值同号".format(a, b))
+        if abs(fa) < abs(fb):
+            a, b, fa, fb = b, a, fb, fa
+        c, fc = a, fa
+        d = e = b - a
+        count = 0
+        while count < max_iter:
+            if fb == 0:
+                break
+            # 保证 b 为当前最好的近似，[b, c] 为有根区间
+            if fb * fc > 0:
+                c, fc = a, fa
+                d = e = b - a
+            if abs(fc) < abs(fb):
+                a, b, c = b, c, b
+                fa, fb, fc = fb, fc, fb
+            tol = 2 * np.finfo(float).eps * abs(b) + delta / 2
+            m = (c - b) / 2
+            if abs(m) <= tol:
+                break
+            if abs(e) >= tol and abs(fa) > abs(fb):
+                s = fb / fa
+                if a == c:
+                    # 割线法
+                    p = 2 * m * s
+                    q = 1 - s
+                else:
+                    # 逆二次插值
+                    q = fa / fc
+                    r = fb / fc
+                    p = s * (2 * m * q * (q - r) - (b - a) * (r - 1))
+                    q = (q - 1) * (r - 1) * (s - 1)
+                if p > 0:
+                    q = -q
+                else:
+                    p = -p
+                if 2 * p < min(3 * m * q - abs(tol * q), abs(e * q)):
+                    e = d
+                    d = p / q
+                else:
+                    d = e = m
+            else:
+                d = e = m
+            a, fa = b, fb
+            b += d if abs(d) > tol else (tol if m > 0 else -tol)
+            fb = self.fn(b)
+            count += 1
+        else:
+            print("[Debug] Brent 方法在 {} 次迭代内未收敛".format(max_iter))
+        return (b, count)
+
     # 多变量的不动点迭代
-    def vec_fixed_iter(self, x0, delta):
+    def vec_fixed_iter(self, x0, delta, max_iter: int = 1000):
         x = x0 
         next_x = x0
         count = 0
-        while True:
-            next_x = np.array([self.funcs[i](x) for i in range(len(self.funcs))])
+        while count < max_iter:
+            try:
+                next_x = np.array([self.funcs[i](x) for i in range(len(self.funcs))])
+            except (OverflowError, ValueError):
+                self._failed(count)
+                break
+            if self._diverged(next_x, count):
+                break
             err = max(abs(x - next_x))
             if err < delta:
                 break
             else:
                 x = next_x
             count += 1
+        else:
+            print("[Debug] 多变量不动点迭代在 {} 次迭代内未收敛".format(max_iter))
         return (next_x, count)
 
     # 非线性方程组的牛顿迭代法
-    def vec_newton_iter(self, x0, delta):
+    def vec_newton_iter(self, x0, delta, max_iter: int = 100):
         x = x0
         next_x = x0
         count = 0
-        while True:
-            next_x = x - np.dot(self.Jacobian(x), self.Fn(x))
+        while count < max_iter:
+            # 解线性方程组 J dx = F 求牛顿步，不显式求逆
+            try:
+                next_x = x - np.linalg.solve(self.Jacobian(x), self.Fn(x))
+            except np.linalg.LinAlgError:
+                print("[Debug] 牛顿迭代在第 {} 次时雅可比矩阵奇异".format(count))
+                break
+            except (OverflowError, ValueError):
+                self._failed(count)
+                break
+            if self._diverged(next_x, count):
+                break
             err = max(abs(next_x - x))
             if err < delta:
                 break
             else:
                 x = next_x
             count += 1
+        else:
+            print("[Debug] 多变量牛顿迭代在 {} 次迭代内未收敛".format(max_iter))
         return (x, count)
+
+    # Broyden 拟牛顿法：只在开始时计算一次雅可比矩阵并求逆，之后每步用秩一的 Sherman-Morrison 公式更新逆矩阵 H，
+    # 每次迭代只需一次方程组求值与 O(n^2) 的运算。
+    # mode 为 'good' 时 H += (s - H y) s^T H / (s^T H y)，为 'bad' 时 H += (s - H y) y^T / (y^T y)；
+    # refresh > 0 时每 refresh 步重新计算一次雅可比矩阵，分母接近 0 时也会重新计算
+    def broyden_iter(self, x0, delta, mode: str = 'good', refresh: int = 0, max_iter: int = 1000):
+        if mode not in ('good', 'bad'):
+            raise ValueError("未知的 Broyden 方法: {}".format(mode))
+        x = np.asarray(x0, dtype=float)
+        count = 0
+        try:
+            F = self.Fn(x)
+            H = np.linalg.inv(self.Jacobian(x))
+        except np.linalg.LinAlgError:
+            print("[Debug] Broyden 方法在初始点处雅可比矩阵奇异")
+            return (x, count)
+        except (OverflowError, ValueError):
+            self._failed(count)
+            return (x, count)
+        while count < max_iter:
+            s = -np.dot(H, F)
+            next_x = x + s
+            if self._diverged(next_x, count):
+                break
+            if max(abs(s)) < delta:
+                return (next_x, count)
+            try:
+                next_F = self.Fn(next_x)
+            except (OverflowError, ValueError):
+                self._failed(count)
+                break
+            if self._diverged(next_F, count):
+                break
+            y = next_F - F
+            x, F = next_x, next_F
+            count += 1
+            Hy = np.dot(H, y)
+            if mode == 'good':
+                v = np.dot(s, H)
+            else:
+                v = y
+            denom = np.dot(v, y)
+            if (refresh > 0 and count % refresh == 0) or abs(denom) < 1e-14 * np.linalg.norm(v) * np.linalg.norm(y):
+                try:
+                    H = np.linalg.inv(self.Jacobian(x))
+                except np.linalg.LinAlgError:
+                    print("[Debug] Broyden 方法在第 {} 次时雅可比矩阵奇异".format(count))
+                    break
+                except (OverflowError, ValueError):
+                    self._failed(count)
+                    break
+            else:
+                H += np.outer(s - Hy, v) / denom
+        else:
+            print("[Debug] Broyden 方法在 {} 次迭代内未收敛".format(max_iter))
+        return (x, count)
+
+    # 试探点上的方程组值，math 函数溢出或超出定义域时视为 inf，使该步被拒绝
+    def _trial(self, x):
+        try:
+            return np.asarray(self.Fn(x), dtype=float)
+        except (OverflowError, ValueError):
+            return np.full(len(self.funcs), np.inf)
+
+    # 步长已经小于 delta 而停止时，残差 max|F| 仍大于 sqrt(delta) 说明停在了 ||F|| 的局部极小点等非根处
+    def _check_residual(self, F, delta, count, name):
+        residual = np.max(np.abs(F))
+        if not residual <= np.sqrt(delta):
+            print("[Debug] {}在第 {} 次迭代后停止，但残差 {} 仍较大，可能陷入了 ||F|| 的局部极小点".format(name, count, residual))
+
+    # 牛顿步 J p = -F，雅可比矩阵奇异时取最小二乘解
+    def _newton_step(self, J, F):
+        try:
+            return np.linalg.solve(J, -F)
+        except np.linalg.LinAlgError:
+            return np.linalg.lstsq(J, -F, rcond=None)[0]
+
+    # 带 Armijo 回溯线搜索的阻尼牛顿法，以 phi(x) = ||F(x)||^2 / 2 为价值函数，
+    # 沿牛顿方向 p 取 t = 1, 1/2, 1/4, ... 直到 ||F(x + t p)||^2 <= (1 - 2 c t) ||F(x)||^2。
+    # 返回 (解, 迭代次数, 方程组求值次数)，求值次数包括差分雅可比矩阵所用的次数
+    def line_search_iter(self, x0, delta, c: float = 1e-4, max_iter: int = 200):
+        evals = self.evals
+        x = np.asarray(x0, dtype=float)
+        F = self.Fn(x)
+        count = 0
+        while count < max_iter:
+            if not np.any(F):
+                break
+            p = self._newton_step(self.Jacobian(x), F)
+            norm = np.dot(F, F)
+            t = 1.0
+            while True:
+                next_x = x + t * p
+                next_F = self._trial(next_x)
+                with np.errstate(over='ignore'):
+                    next_norm = np.dot(next_F, next_F)
+                if next_norm <= (1 - 2 * c * t) * norm or t < 1e-10:
+                    break
+                t /= 2
+            # 牛顿方向上已无法使 ||F|| 下降，通常说明到达了根或陷入了 ||F|| 的局部极小点，退出时检查残差
+            if not next_norm <= (1 - 2 * c * t) * norm:
+                break
+            count += 1
+            err = max(abs(next_x - x))
+            x, F = next_x, next_F
+            if err < delta:
+                break
+        else:
+            print("[Debug] 线搜索牛顿法在 {} 次迭代内未收敛".format(max_iter))
+            return (x, count, self.evals - evals)
+        self._check_residual(F, delta, count, "线搜索牛顿法")
+        return (x, count, self.evals - evals)
+
+    # 信赖域方法，method 为 'dogleg' 或 'lm'
+    # dogleg: 在半径为 radius 的信赖域内，沿最速下降的 Cauchy 点与牛顿点组成的折线取步长；
+    # lm: Levenberg-Marquardt，解 (J^T J + mu I) p = -J^T F，mu 越大步长越接近短的梯度方向。
+    # 由实际下降量与线性模型预测下降量之比 rho 决定是否接受该步以及如何调整 radius 或 mu。
+    # 返回 (解, 迭代次数, 方程组求值次数)
+    def trust_region_iter(self, x0, delta, method: str = 'dogleg', radius: float = 1.0, max_iter: int = 200):
+        if method not in ('dogleg', 'lm'):
+            raise ValueError("未知的信赖域方法: {}".format(method))
+        evals = self.evals
+        x = np.asarray(x0, dtype=float)
+        F = self.Fn(x)
+        J = self.Jacobian(x)
+        mu = None
+        nu = 2.0
+        count = 0
+        while count < max_iter:
+            if not np.any(F):
+                break
+            g = np.dot(J.T, F)
+            if method == 'dogleg':
+                p = self._newton_step(J, F)
+                if np.linalg.norm(p) > radius:
+                    # Cauchy 点 -(||g||^2 / ||J g||^2) g
+                    Jg = np.dot(J, g)
+                    pc = -(np.dot(g, g) / np.dot(Jg, Jg)) * g
+                    if np.linalg.norm(pc) >= radius:
+                        p = -radius * g / np.linalg.norm(g)
+                    else:
+                        # 求 tau 使 ||pc + tau (p - pc)|| = radius
+                        d = p - pc
+                        a = np.dot(d, d)
+                        b = 2 * np.dot(pc, d)
+                        tau = (-b + np.sqrt(b * b - 4 * a * (np.dot(pc, pc) - radius * radius))) / (2 * a)
+                        p = pc + tau * d
+            else:
+                A = np.dot(J.T, J)
+                if mu is None:
+                    mu = 1e-3 * max(np.max(np.diag(A)), 1.0)
+                p = np.linalg.solve(A + mu * np.eye(len(x)), -g)
+            next_x = x + p
+            next_F = self._trial(next_x)
+            model = F + np.dot(J, p)
+            # 以 ||F|| 归一化，避免残差很大时平方溢出
+            scale = np.linalg.norm(F / np.max(np.abs(F)))
+            predicted = 1 - pow(np.linalg.norm(model / np.max(np.abs(F))) / scale, 2)
+            actual = 1 - pow(np.linalg.norm(next_F / np.max(np.abs(F))) / scale, 2)
+            rho = actual / predicted if predicted > 0 and np.isfinite(actual) else -1.0
+            count += 1
+            if method == 'dogleg':
+                if rho < 0.25:
+                    radius /= 4
+                elif rho > 0.75 and np.linalg.norm(p) >= 0.99 * radius:
+                    radius *= 2
+            else:
+                if rho > 0:
+                    mu *= max(1 / 3, 1 - pow(2 * rho - 1, 3))
+                    nu = 2.0
+                else:
+                    mu *= nu
+                    nu *= 2
+            if rho > 1e-4:
+                x, F = next_x, next_F
+                if max(abs(p)) < delta:
+                    break
+                J = self.Jacobian(x)
+            elif max(abs(p)) < delta:
+                break
+        else:
+            print("[Debug] 信赖域方法在 {} 次迭代内未收敛".format(max_iter))
+            return (x, count, self.evals - evals)
+        self._check_residual(F, delta, count, "信赖域方法")
+        return (x, count, self.evals - evals)
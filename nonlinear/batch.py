@@ -0,0 +1,67 @@
+import numpy as np
+
+# 批量求解大量标量方程：x0 为初始点数组，params 为可选的参数数组，两者按 numpy 规则广播到相同形状，
+# 每个元素对应一个独立的方程 fn(x) 或 fn(x, p)，fn 需要能作用于数组。
+# 所有方程同时迭代，已收敛或出现 nan/inf (发散)的元素不再参与计算，发散的方程个数会单独提示。
+# 返回 (根的数组, 迭代次数数组)
+
+def _lanes(x0, params):
+    if params is None:
+        x = np.array(x0, dtype=float)
+        return (x, None)
+    x, p = np.broadcast_arrays(np.asarray(x0, dtype=float), np.asarray(params))
+    return (np.array(x), p)
+
+def _call(fn, x, p):
+    return fn(x) if p is None else fn(x, p)
+
+# step(x, p) 给出下一步的迭代值，x 与 p 只包含尚未收敛的元素
+def _iterate(step, x0, params, delta, max_iter):
+    x, p = _lanes(x0, params)
+    shape = x.shape
+    x = x.ravel()
+    p = None if p is None else p.ravel()
+    count = np.zeros(x.shape, dtype=int)
+    active = np.arange(x.size)
+    diverged = 0
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        for _ in range(max_iter):
+            if active.size == 0:
+                break
+            xa = x[active]
+            next_x = step(xa, None if p is None else p[active])
+            x[active] = next_x
+            count[active] += 1
+            finite = np.isfinite(next_x)
+            diverged += np.count_nonzero(~finite)
+            active = active[(np.abs(next_x - xa) >= delta) & finite]
+    if diverged > 0:
+        print("[Debug] 有 {} 个方程在迭代中发散(出现 nan 或 inf)".format(diverged))
+    if active.size > 0:
+        print("[Debug] 有 {} 个方程在 {} 次迭代内未收敛".format(active.size, max_iter))
+    return (x.reshape(shape), count.reshape(shape))
+
+# 不动点迭代 x = fn(x)
+def batch_fixed_iter(fn, x0, delta, params=None, max_iter: int = 1000):
+    def step(x, p):
+        return _call(fn, x, p)
+    return _iterate(step, x0, params, delta, max_iter)
+
+# 斯蒂芬森迭代，分母 z - 2y + x 为 0 时说明 y 已是不动点，直接取 y
+def batch_stefenson_iter(fn, x0, delta, params=None, max_iter: int = 1000):
+    def step(x, p):
+        y = _call(fn, x, p)
+        z = _call(fn, y, p)
+        denom = z - 2 * y + x
+        zero = denom == 0
+        return np.where(zero, y, x - (y - x) * (y - x) / np.where(zero, 1, denom))
+    return _iterate(step, x0, params, delta, max_iter)
+
+# 牛顿迭代法求 fn(x) = 0，dfn 为导函数；不提供时使用复步长求导，此时 fn 需要能作用于复数且是解析的(不能含 abs、取实部等运算)
+def batch_newton_iter(fn, x0, delta, params=None, dfn=None, max_iter: int = 100):
+    def step(x, p):
+        if dfn is None:
+            y = _call(fn, x + 1e-20j, p)
+            return x - np.real(y) / (np.imag(y) / 1e-20)
+        return x - _call(fn, x, p) / _call(dfn, x, p)
+    return _iterate(step, x0, params, delta, max_iter)
@@ -1,7 +1,4 @@
 import numpy as np
-import random
-import math 
-from typing import List
 
 class Point:
     def __init__(self, x: float, y: float):
@@ -12,6 +9,76 @@ class Point:
         self.d = d
 
 
+# 采样点集合中单个点的视图，只保存所属集合与下标，读写直接作用于集合中的数组
+class SamplePoint:
+    __slots__ = ('samples', 'index')
+
+    def __init__(self, samples, index: int):
+        self.samples = samples
+        self.index = index
+
+    @property
+    def x(self):
+        return self.samples.x[self.index]
+
+    @property
+    def y(self):
+        return self.samples.y[self.index]
+
+    @property
+    def d(self):
+        if self.samples.d is None:
+            raise AttributeError('d')
+        return self.samples.d[self.index]
+
+    def derivative(self, d):
+        if self.samples.d is None:
+            self.samples.d = np.zeros_like(self.samples.x)
+        self.samples.d[self.index] = d
+
+
+# 按列存储的采样点集合，x, y 以及可选的导数 d 各自为连续的数组
+class SampleSet:
+    __slots__ = ('x', 'y', 'd')
+
+    def __init__(self, x, y, d=None):
+        self.x = np.ascontiguousarray(x, dtype=float)
+        self.y = np.ascontiguousarray(y, dtype=float)
+        self.d = None if d is None else np.ascontiguousarray(d, dtype=float)
+
+    # 将 Point 列表转换为 SampleSet，已经是 SampleSet 时直接返回
+    @staticmethod
+    def of(samples):
+        if isinstance(samples, SampleSet):
+            return samples
+        x = [item.x for item in samples]
+        y = [item.y for item in samples]
+        d = None
+        if len(samples) > 0 and all(hasattr(item, 'd') for item in samples):
+            d = [item.d for item in samples]
+        return SampleSet(x, y, d)
+
+    def derivative(self, d):
+        self.d = np.array(np.broadcast_to(d, self.x.shape), dtype=float)
+
+    def __len__(self):
+        return len(self.x)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            d = None if self.d is None else self.d[index]
+            return SampleSet(self.x[index], self.y[index], d)
+        if index < 0:
+            index += len(self.x)
+        if index < 0 or index >= len(self.x):
+            raise IndexError(index)
+        return SamplePoint(self, index)
+
+    def __iter__(self):
+        for i in range(len(self.x)):
+            yield SamplePoint(self, i)
+
+
 class PolyFn:
     def __init__(self, fn: np.poly1d, a: float, b: float):
         # 多项式表达式
@@ -21,56 +88,39 @@ class PolyFn:
         self.b = b
 
 # 对于给定三角函数求导并计算给定点导数
-def point_derivative(x: float, c: float, d: float, e: float, f: float):
-    y = c * d * math.cos(d * x) - e * f * math.sin(f * x)
+def point_derivative(x, c: float, d: float, e: float, f: float):
+    y = c * d * np.cos(d * x) - e * f * np.sin(f * x)
     return y
 
 
 # 根据给定区间以及点数对点进行采样(插值法)
 def random_sample(n: int, a: float, b: float, c: float, d: float, e: float, f: float):
-    points = []
-    for _ in range(n):
-        x = a + random.random() * (b - a)
-        y = c * math.sin(d * x) + e * math.cos(f * x)
-        points.append(Point(x, y))
-    return points
+    x = a + np.random.random(n) * (b - a)
+    y = c * np.sin(d * x) + e * np.cos(f * x)
+    return SampleSet(x, y)
 
 # 根据给定区间以及点数，计算固定步长进行采样(插值法)
 def fixed_sample(n: int, a: float, b: float, c: float, d: float, e: float, f: float):
-    points = []
-    step = (b - a) / n 
-    for i in range(n):
-        x = i * step + a 
-        y = c * math.sin(d * x) + e * math.cos(f * x)
-        points.append(Point(x, y))
-    x = b 
-    y = c * math.sin(d * x) + e * math.cos(f * x)
-    points.append(Point(x, y))
-    return points
+    x = np.linspace(a, b, n + 1)
+    y = c * np.sin(d * x) + e * np.cos(f * x)
+    return SampleSet(x, y)
+
+# 在给定区间上取切比雪夫节点进行采样(插值法)
+def chebyshev_sample(n: int, a: float, b: float, c: float, d: float, e: float, f: float):
+    t = np.cos((2 * np.arange(n + 1) + 1) * np.pi / (2 * (n + 1)))
+    x = ((b - a) / 2) * t + ((b + a) / 2)
+    y = c * np.sin(d * x) + e * np.cos(f * x)
+    return SampleSet(x, y)
 
 def random_x(a: int, b: int, n: int):
-    x_axis = []
-    for _ in range(0, n):
-        x = random.random() * (b - a) + a 
-        x_axis.append(x)
-    return x_axis
+    return np.random.random(n) * (b - a) + a
 
 def approx_fixed_sample(n: int, a: float, b: float, c: float):
-    points = []
-    step = (b - a) / n 
-    for i in range(n):
-        x = i * step + a 
-        y = 1 / ((c * x * x) + 1)
-        points.append(Point(x, y))
-    x = b 
+    x = np.linspace(a, b, n + 1)
     y = 1 / ((c * x * x) + 1)
-    points.append(Point(x, y))
-    return points
+    return SampleSet(x, y)
 
 def approx_random_sample(n: int, a: float, b: float, c: float):
-    points = []
-    for _ in range(n):
-        x = a + random.random() * (b - a)
-        y = 1 / ((c * x * x) + 1)
-        points.append(Point(x, y))
-    return points
+    x = a + np.random.random(n) * (b - a)
+    y = 1 / ((c * x * x) + 1)
+    return SampleSet(x, y)